@@ -1,4 +1,13 @@
-# Custom DynamicArray, SLNode, LinkedList data structures and hash functions.
+# Custom DynamicArray, SLNode, LinkedList, SortedChain data structures and hash functions.
+
+import hashlib
+import os
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is only needed by the bulk hash functions.
+    np = None
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -11,13 +20,25 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length, filled, raw
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
 
+    @classmethod
+    def filled(cls, length: int, value: object = None) -> "DynamicArray":
+        """
+        Return a new array of the given length with every element set to value.
+        The same value object is shared by every element.
+        """
+        da = cls()
+        da._data = [value] * length
+        return da
+
     def __iter__(self):
         """
         Disable iterator capability for DynamicArray class
@@ -72,6 +93,68 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def raw(self) -> list:
+        """
+        Return the list backing the array, for unchecked indexing in hot loops.
+        For internal use by the HashMaps: callers must keep indices in bounds
+        and must not change the list's length.
+        """
+        return self._data
+
+
+class ProbeHistogram:
+    """
+    Histogram of how many buckets or chain nodes each operation examined,
+    used by the HashMaps' instrumentation mode.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self._counts = {}
+        self._total = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        summary = self.summary()
+        return ' '.join(name + ': ' + str(summary[name]) for name in summary)
+
+    def record(self, probes: int) -> None:
+        """Count one operation that examined the given number of buckets or nodes."""
+        self._counts[probes] = self._counts.get(probes, 0) + 1
+        self._total += 1
+
+    def count(self) -> int:
+        """Return the number of operations recorded."""
+        return self._total
+
+    def mean(self) -> float:
+        """Return the average probe count, or 0 if nothing was recorded."""
+        if self._total == 0:
+            return 0.0
+        return sum(probes * count for probes, count in self._counts.items()) / self._total
+
+    def percentile(self, percent: float) -> int:
+        """
+        Return the smallest probe count that at least percent % of the
+        recorded operations did not exceed, or 0 if nothing was recorded.
+        """
+        needed = self._total * percent / 100
+        seen = 0
+        for probes in sorted(self._counts):
+            seen += self._counts[probes]
+            if seen >= needed:
+                return probes
+        return 0
+
+    def summary(self) -> dict:
+        """Return the operation count and the p50, p99 and max probe counts."""
+        return {
+            'count': self._total,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': max(self._counts) if self._counts else 0,
+        }
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -95,6 +178,289 @@ def hash_function_3(key: str) -> int:
     hash = key % 7
     return hash
 
+
+def _code_point_matrix(keys):
+    """
+    Return the keys as a 2-D uint32 array of code points, one row per key,
+    padded with zeros to the longest key. Zero padding adds nothing to the
+    sums below, so results match the scalar functions exactly.
+    """
+    if np is None:
+        raise ImportError("bulk hash functions require NumPy")
+    keys = np.asarray(keys, dtype=np.str_)
+    if keys.size == 0:
+        return np.zeros((0, 0), dtype=np.uint32)
+    return keys.reshape(-1).view(np.uint32).reshape(keys.size, -1)
+
+
+def hash_function_1_bulk(keys) -> "np.ndarray":
+    """Vectorized hash_function_1 over a sequence of keys; returns an int64 array"""
+    return _code_point_matrix(keys).sum(axis=1, dtype=np.int64)
+
+
+def hash_function_2_bulk(keys) -> "np.ndarray":
+    """Vectorized hash_function_2 over a sequence of keys; returns an int64 array"""
+    codes = _code_point_matrix(keys)
+    weights = np.arange(1, codes.shape[1] + 1, dtype=np.int64)
+    return codes.astype(np.int64) @ weights
+
+
+_BULK_HASH_FUNCTIONS = {
+    hash_function_1: hash_function_1_bulk,
+    hash_function_2: hash_function_2_bulk,
+}
+
+
+# The bulk functions pad every key to the longest one in the batch. Keys more
+# than _BULK_LONG_KEY_FACTOR times the mean length are hashed one at a time,
+# and the rest go through NumPy in chunks of at most _BULK_MAX_CELLS code points.
+_BULK_LONG_KEY_FACTOR = 4
+_BULK_MAX_CELLS = 1 << 20
+
+
+def hash_many(function, keys: list) -> list:
+    """
+    Return [function(key) for key in keys], using the NumPy bulk version of
+    function when one exists, NumPy is installed and every key is a str.
+    """
+    bulk = _BULK_HASH_FUNCTIONS.get(function)
+    if bulk is None or np is None or not keys or \
+            not all(type(key) is str for key in keys):
+        return list(map(function, keys))
+
+    lengths = list(map(len, keys))
+    limit = _BULK_LONG_KEY_FACTOR * (sum(lengths) // len(keys) + 1)
+    longest = max(lengths)
+    if longest <= limit and len(keys) * longest <= _BULK_MAX_CELLS:
+        return bulk(keys).tolist()
+
+    # Hash the long keys one at a time and the others in bounded chunks.
+    hashes = [None] * len(keys)
+    short = []
+    for index, key in enumerate(keys):
+        if lengths[index] > limit:
+            hashes[index] = function(key)
+        else:
+            short.append(index)
+    rows = max(1, _BULK_MAX_CELLS // min(limit, longest))
+    for start in range(0, len(short), rows):
+        chunk = short[start:start + rows]
+        for index, hash in zip(chunk, bulk([keys[index] for index in chunk]).tolist()):
+            hashes[index] = hash
+    return hashes
+
+# ----------- Hash functions selectable by name in both HashMaps ----------- #
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _key_bytes(key) -> bytes:
+    """Return the bytes a key is hashed as: UTF-8 for str, two's complement for int."""
+    if type(key) is str:
+        return key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    if isinstance(key, int):
+        return key.to_bytes(key.bit_length() // 8 + 1, 'little', signed=True)
+    raise TypeError("cannot hash key of type " + type(key).__name__)
+
+
+def _rotl_64(value: int, bits: int) -> int:
+    """Rotate a 64-bit value left by the given number of bits."""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def fnv1a_hash(key, seed: int = 0) -> int:
+    """64-bit FNV-1a hash of a str, bytes or int key; a seed perturbs the offset basis"""
+    hash = (0xCBF29CE484222325 ^ seed) & _MASK_64
+    for byte in _key_bytes(key):
+        hash = ((hash ^ byte) * 0x100000001B3) & _MASK_64
+    return hash
+
+
+_XXH_PRIME_1 = 0x9E3779B185EBCA87
+_XXH_PRIME_2 = 0xC2B2AE3D27D4EB4F
+_XXH_PRIME_3 = 0x165667B19E3779F9
+_XXH_PRIME_4 = 0x85EBCA77C2B2AE63
+_XXH_PRIME_5 = 0x27D4EB2F165667C5
+
+
+def _xxh64_round(acc: int, lane: int) -> int:
+    """Mix one 64-bit lane into an XXH64 accumulator."""
+    return (_rotl_64((acc + lane * _XXH_PRIME_2) & _MASK_64, 31) * _XXH_PRIME_1) & _MASK_64
+
+
+def _xxh64_merge(hash: int, acc: int) -> int:
+    """Fold one of the four stripe accumulators into the XXH64 hash."""
+    hash ^= _xxh64_round(0, acc)
+    return (hash * _XXH_PRIME_1 + _XXH_PRIME_4) & _MASK_64
+
+
+def xxhash64(key, seed: int = 0) -> int:
+    """XXH64 hash of a str, bytes or int key, with an optional 64-bit seed"""
+    data = _key_bytes(key)
+    length = len(data)
+    seed &= _MASK_64
+    offset = 0
+
+    if length >= 32:
+        v1 = (seed + _XXH_PRIME_1 + _XXH_PRIME_2) & _MASK_64
+        v2 = (seed + _XXH_PRIME_2) & _MASK_64
+        v3 = seed
+        v4 = (seed - _XXH_PRIME_1) & _MASK_64
+        while offset <= length - 32:
+            v1 = _xxh64_round(v1, int.from_bytes(data[offset:offset + 8], 'little'))
+            v2 = _xxh64_round(v2, int.from_bytes(data[offset + 8:offset + 16], 'little'))
+            v3 = _xxh64_round(v3, int.from_bytes(data[offset + 16:offset + 24], 'little'))
+            v4 = _xxh64_round(v4, int.from_bytes(data[offset + 24:offset + 32], 'little'))
+            offset += 32
+        hash = (_rotl_64(v1, 1) + _rotl_64(v2, 7) + _rotl_64(v3, 12) + _rotl_64(v4, 18)) & _MASK_64
+        for acc in (v1, v2, v3, v4):
+            hash = _xxh64_merge(hash, acc)
+    else:
+        hash = (seed + _XXH_PRIME_5) & _MASK_64
+
+    hash = (hash + length) & _MASK_64
+    while offset <= length - 8:
+        hash ^= _xxh64_round(0, int.from_bytes(data[offset:offset + 8], 'little'))
+        hash = (_rotl_64(hash, 27) * _XXH_PRIME_1 + _XXH_PRIME_4) & _MASK_64
+        offset += 8
+    if offset <= length - 4:
+        hash ^= (int.from_bytes(data[offset:offset + 4], 'little') * _XXH_PRIME_1) & _MASK_64
+        hash = (_rotl_64(hash, 23) * _XXH_PRIME_2 + _XXH_PRIME_3) & _MASK_64
+        offset += 4
+    for byte in data[offset:]:
+        hash ^= (byte * _XXH_PRIME_5) & _MASK_64
+        hash = (_rotl_64(hash, 11) * _XXH_PRIME_1) & _MASK_64
+
+    # Final avalanche.
+    hash ^= hash >> 33
+    hash = (hash * _XXH_PRIME_2) & _MASK_64
+    hash ^= hash >> 29
+    hash = (hash * _XXH_PRIME_3) & _MASK_64
+    return hash ^ (hash >> 32)
+
+
+def siphash24(key, k0: int = 0, k1: int = 0) -> int:
+    """
+    SipHash-2-4 of a str, bytes or int key under the 128-bit secret (k0, k1).
+    A reference implementation in pure Python, and so slow; for untrusted
+    input blake2b_hash() gives the same protection from C.
+    """
+    data = _key_bytes(key)
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    # The last word carries the leftover bytes and the length in its top byte.
+    end = len(data) - len(data) % 8
+    words = [int.from_bytes(data[i:i + 8], 'little') for i in range(0, end, 8)]
+    words.append(int.from_bytes(data[end:], 'little') | (len(data) & 0xFF) << 56)
+
+    def rounds(count):
+        nonlocal v0, v1, v2, v3
+        for _ in range(count):
+            v0 = (v0 + v1) & _MASK_64
+            v1 = _rotl_64(v1, 13) ^ v0
+            v0 = _rotl_64(v0, 32)
+            v2 = (v2 + v3) & _MASK_64
+            v3 = _rotl_64(v3, 16) ^ v2
+            v0 = (v0 + v3) & _MASK_64
+            v3 = _rotl_64(v3, 21) ^ v0
+            v2 = (v2 + v1) & _MASK_64
+            v1 = _rotl_64(v1, 17) ^ v2
+            v2 = _rotl_64(v2, 32)
+
+    for word in words:
+        v3 ^= word
+        rounds(2)
+        v0 ^= word
+    v2 ^= 0xFF
+    rounds(4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def blake2b_hash(key, secret: bytes = b'') -> int:
+    """
+    64-bit keyed BLAKE2b (hashlib, implemented in C) of a str, bytes or int
+    key under a secret of up to 64 bytes. With a secret the caller keeps
+    private, an attacker cannot pick keys that collide, which makes it the
+    choice for untrusted input.
+    """
+    return int.from_bytes(hashlib.blake2b(_key_bytes(key), digest_size=8, key=secret).digest(),
+                          'little')
+
+
+def builtin_hash(key) -> int:
+    """
+    Python's builtin hash(), usable with any hashable key, and the fastest
+    choice. CPython already hashes str and bytes with SipHash under a
+    per-process secret (see PYTHONHASHSEED), but ints, tuples and other
+    types hash predictably.
+    """
+    return hash(key)
+
+
+# Hash functions that a HashMap's function argument may name.
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'hash_function_3': hash_function_3,
+    'fnv1a': fnv1a_hash,
+    'xxhash64': xxhash64,
+    'siphash24': siphash24,
+    'blake2b': blake2b_hash,
+    'builtin': builtin_hash,
+}
+
+
+def seeded_hash_function(name: str, seed: int = None):
+    """
+    Return a seeded variant of the named hash function ('fnv1a', 'xxhash64',
+    'siphash24' or 'blake2b'). If seed is None a random 128-bit seed is drawn,
+    so hash values differ from process to process. Only the keyed 'siphash24'
+    and 'blake2b' variants resist keys chosen to collide, and 'blake2b' is
+    the fast one.
+    """
+    if seed is None:
+        seed = int.from_bytes(os.urandom(16), 'little')
+    low, high = seed & _MASK_64, (seed >> 64) & _MASK_64
+
+    if name == 'fnv1a':
+        def function(key):
+            return fnv1a_hash(key, low)
+    elif name == 'xxhash64':
+        def function(key):
+            return xxhash64(key, low)
+    elif name == 'siphash24':
+        def function(key):
+            return siphash24(key, low, high)
+    elif name == 'blake2b':
+        secret = seed.to_bytes(16, 'little')
+
+        def function(key):
+            return blake2b_hash(key, secret)
+    else:
+        raise ValueError("no seeded variant of hash function " + repr(name))
+
+    function.__name__ = name + '_seeded'
+    return function
+
+
+def get_hash_function(function):
+    """
+    Return the hash function a HashMap should use: function itself if it is
+    callable, otherwise the entry of HASH_FUNCTIONS it names.
+    """
+    if callable(function):
+        return function
+    try:
+        return HASH_FUNCTIONS[function]
+    except KeyError:
+        raise ValueError("unknown hash function " + repr(function)) from None
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -102,11 +468,16 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # No per-node __dict__: a map holds one node per entry.
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """Initialize node given a key, value and optionally the key's hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -118,6 +489,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -140,9 +513,13 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, remove, contains, move_to_front,
+    transpose, length, iterator
     """
 
+    # The SC HashMap holds one list per occupied bucket.
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -167,20 +544,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -191,28 +570,183 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
 
+    def move_to_front(self, key: str, hash: int = None) -> SLNode:
+        """
+        Like contains(), but the matching node is also moved to the head of
+        the list, so keys that are looked up often are found sooner.
+        """
+        previous, node = None, self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous:
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                return node
+            previous, node = node, node.next
+        return None
+
+    def transpose(self, key: str, hash: int = None) -> SLNode:
+        """
+        Like contains(), but the matching node also swaps places with the
+        node before it, so keys that are looked up often drift to the head.
+        """
+        before_previous, previous, node = None, None, self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous:
+                    previous.next = node.next
+                    node.next = previous
+                    if before_previous:
+                        before_previous.next = node
+                    else:
+                        self._head = node
+                return node
+            before_previous, previous, node = previous, node, node.next
+        return None
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+# Key types whose < is a total order, so (hash, key) pairs of them can be
+# bisected. Other types may compare without raising but only partially
+# (e.g. frozenset's < is a subset test), which would make bisect miss keys.
+_TOTALLY_ORDERED_KEYS = (str, bytes, int)
+
+
+class SortedChain:
+    """
+    Chain of SLNodes for a Separate Chaining HashMap bucket that has grown
+    long, kept in a list sorted by hash so that lookups are a binary search.
+    While every key is a str, bytes or int the list is sorted by (hash, key);
+    otherwise keys with equal hashes are searched linearly.
+    Supported methods are: insert, remove, contains, move_to_front,
+    transpose, length, iterator
+    """
+
+    __slots__ = ('_entries', '_nodes', '_ordered')
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize a sorted chain holding the given nodes, which are moved
+        in rather than copied (e.g. from the LinkedList being replaced).
+        """
+        nodes = list(nodes)
+        for node in nodes:
+            node.next = None
+        self._ordered = all(type(node.key) in _TOTALLY_ORDERED_KEYS for node in nodes)
+        if self._ordered:
+            try:
+                nodes.sort(key=lambda node: (node.hash, node.key))
+            except TypeError:
+                # e.g. str and int keys with the same hash.
+                self._ordered = False
+        if not self._ordered:
+            nodes.sort(key=lambda node: node.hash)
+        self._nodes = nodes
+        self._entries = [(node.hash, node.key) for node in nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'Sorted [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in (hash, key) order."""
+        return iter(self._nodes)
+
+    def _index(self, key: str, hash: int) -> int:
+        """Return the position of the node with matching key, or -1."""
+        entries = self._entries
+        if self._ordered:
+            try:
+                index = bisect_left(entries, (hash, key))
+                if index < len(entries) and entries[index][0] == hash and \
+                        entries[index][1] == key:
+                    return index
+                return -1
+            except TypeError:
+                # key cannot be ordered against a key with the same hash.
+                pass
+
+        # (hash,) sorts before every (hash, key), so no keys are compared.
+        index = bisect_left(entries, (hash,))
+        while index < len(entries) and entries[index][0] == hash:
+            if entries[index][1] == key:
+                return index
+            index += 1
+        return -1
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """Insert new node for a key that is not in the chain."""
+        index = -1
+        if type(key) not in _TOTALLY_ORDERED_KEYS:
+            # From now on only the hash order is kept.
+            self._ordered = False
+        if self._ordered:
+            try:
+                index = bisect_right(self._entries, (hash, key))
+            except TypeError:
+                # From now on only the hash order is kept.
+                self._ordered = False
+        if index < 0:
+            index = bisect_left(self._entries, (hash,))
+        self._entries.insert(index, (hash, key))
+        self._nodes.insert(index, SLNode(key, value, None, hash))
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index = self._index(key, hash)
+        if index < 0:
+            return False
+        del self._entries[index]
+        del self._nodes[index]
+        return True
+
+    def contains(self, key: str, hash: int) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        index = self._index(key, hash)
+        return self._nodes[index] if index >= 0 else None
+
+    # A sorted chain has no order to adapt, so the self-organizing lookups
+    # of LinkedList are plain lookups here.
+    move_to_front = contains
+    transpose = contains
+
+    def length(self) -> int:
+        """Return the length of the chain."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # No per-entry __dict__: a map holds one entry per key.
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """Initialize an entry for use in a hash map, caching the key's hash."""
         self.key = key
         self.value = value
+        self.hash = hash
         self.is_tombstone = False
 
     def __str__(self) -> str:
@@ -0,0 +1,533 @@
+# Description: Timing benchmarks for the Separate Chaining (SC) and
+# Open Addressing (OA) HashMap implementations.
+# Run directly with `python benchmark.py`; each benchmark prints a small table.
+
+import gc
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+import hash_map_concurrent
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_soa
+import hash_quality
+from a6_include import (HASH_FUNCTIONS, DynamicArray, LinkedList, hash_function_1,
+                        hash_function_1_bulk, hash_function_2, hash_function_2_bulk,
+                        seeded_hash_function)
+
+
+def _ns_per_call(fn, args: list) -> float:
+    """Return the average time in nanoseconds of calling fn once per argument."""
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) * 1e9 / len(args)
+
+
+def bench_sc_lookup_scaling(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6),
+                            samples: int = 10000) -> None:
+    """
+    Grow an SC HashMap from a tiny initial capacity and time get() at each size.
+    With load-factor-driven resizing the per-lookup time should stay flat.
+    """
+    print("\nSC lookup latency vs. size (initial capacity 11)")
+    print(f"{'size':>10} {'capacity':>10} {'load':>6} {'ns/get':>8}")
+    for size in sizes:
+        m = hash_map_sc.HashMap(11, hash)
+        for i in range(size):
+            m.put('key' + str(i), i)
+
+        keys = ['key' + str(random.randrange(size)) for _ in range(samples)]
+        ns = _ns_per_call(m.get, keys)
+        print(f"{size:>10} {m.get_capacity():>10} {m.table_load():>6.2f} {ns:>8.0f}")
+
+
+def _traced_bytes(build) -> int:
+    """Return the bytes still allocated by the object that build() returns."""
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def bench_oa_memory(size: int = 10 ** 6) -> None:
+    """
+    Compare the memory held by the HashEntry-based OA HashMap and the
+    struct-of-arrays HashMap after inserting size integer keys.
+    """
+    def build(module):
+        def fill():
+            m = module.HashMap(size * 2, hash)
+            for i in range(size):
+                m.put(i, i)
+            return m
+        return fill
+
+    print(f"\nOA memory at {size} entries (keys and values are small ints)")
+    print(f"{'layout':>16} {'MiB':>8} {'bytes/entry':>12}")
+    for name, module in (("HashEntry", hash_map_oa), ("struct-of-arrays", hash_map_soa)):
+        used = _traced_bytes(build(module))
+        print(f"{name:>16} {used / 2 ** 20:>8.1f} {used / size:>12.1f}")
+
+
+def bench_sc_memory(size: int = 10 ** 6) -> None:
+    """
+    Report the memory the SC HashMap holds per empty bucket and per entry at
+    load 1, next to the per-bucket cost of allocating an empty LinkedList in
+    every bucket up front.
+    """
+    def empty():
+        return hash_map_sc.HashMap(size, hash)
+
+    def eager():
+        return DynamicArray([LinkedList() for _ in range(size)])
+
+    def fill():
+        m = hash_map_sc.HashMap(size, hash, max_load_factor=None)
+        for i in range(size):
+            m.put(i, i)
+        return m
+
+    empty_bytes = _traced_bytes(empty)
+    eager_bytes = _traced_bytes(eager)
+    full_bytes = _traced_bytes(fill)
+
+    print(f"\nSC memory at {size} buckets (keys and values are the same int)")
+    print(f"{'measure':>32} {'bytes':>8}")
+    print(f"{'per empty bucket (None)':>32} {empty_bytes / size:>8.1f}")
+    print(f"{'per empty bucket (LinkedList)':>32} {eager_bytes / size:>8.1f}")
+    print(f"{'per entry, chains included':>32} {(full_bytes - empty_bytes) / size:>8.1f}")
+
+
+def bench_memory_per_entry(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)) -> None:
+    """
+    Report the bytes each map type holds per entry when grown from a small
+    capacity with its default load factor. The keys are built before tracing
+    starts, so only the map's own structures are counted.
+    """
+    modules = (("SC", hash_map_sc), ("OA", hash_map_oa), ("Robin Hood", hash_map_rh),
+               ("struct-of-arrays", hash_map_soa), ("concurrent SC", hash_map_concurrent))
+
+    print("\nBytes per entry, keys and values excluded (int keys, grown from capacity 11)")
+    print(f"{'map':>16}" + ''.join(f"{size:>10}" for size in sizes))
+    for name, module in modules:
+        row = f"{name:>16}"
+        for size in sizes:
+            keys = list(range(size))
+
+            def fill():
+                m = module.HashMap(11, hash)
+                for key in keys:
+                    m.put(key, key)
+                return m
+
+            row += f"{_traced_bytes(fill) / size:>10.1f}"
+        print(row)
+
+
+def bench_bulk_hash(size: int = 10 ** 6) -> None:
+    """
+    Time the scalar hash functions in a Python loop against their NumPy bulk
+    versions on the same keys, checking that the results are identical.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+
+    print(f"\nBulk hashing of {size} keys")
+    print(f"{'function':>16} {'loop s':>8} {'bulk s':>8} {'speedup':>8} {'same':>5}")
+    for name, scalar, bulk in (("hash_function_1", hash_function_1, hash_function_1_bulk),
+                               ("hash_function_2", hash_function_2, hash_function_2_bulk)):
+        start = time.perf_counter()
+        expected = [scalar(key) for key in keys]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = bulk(keys)
+        bulk_time = time.perf_counter() - start
+
+        same = result.tolist() == expected
+        print(f"{name:>16} {loop_time:>8.3f} {bulk_time:>8.3f} "
+              f"{loop_time / bulk_time:>7.1f}x {str(same):>5}")
+
+
+def bench_batch_ops(size: int = 5000, functions=(hash_function_2, hash),
+                    repeats: int = 5) -> None:
+    """
+    Compare put_many / get_many / remove_many against a Python loop of
+    single put / get / remove calls on string keys. get and remove run on
+    two maps built by the same put loop, so both see the same table. The
+    loop and the batch take turns, and the best of repeats runs is kept.
+    """
+    pairs = [('key' + str(i), i) for i in range(size)]
+    keys = [key for key, _ in pairs]
+
+    print(f"\nBatch vs. single-call throughput, {size} string keys")
+    print(f"{'function':>16} {'map':>4} {'op':>7} {'loop s':>8} {'batch s':>8} {'speedup':>8}")
+    for function, (name, module) in itertools.product(
+            functions, (("SC", hash_map_sc), ("OA", hash_map_oa))):
+        def filled():
+            m = module.HashMap(11, function)
+            for key, value in pairs:
+                m.put(key, value)
+            return m
+
+        for op, single, batch in (
+                ("put", lambda m: [m.put(k, v) for k, v in pairs],
+                 lambda m: m.put_many(pairs)),
+                ("get", lambda m: [m.get(k) for k in keys],
+                 lambda m: m.get_many(keys)),
+                ("remove", lambda m: [m.remove(k) for k in keys],
+                 lambda m: m.remove_many(keys))):
+            loop_time = batch_time = float('inf')
+            for _ in range(repeats):
+                if op == "put":
+                    looped, batched = module.HashMap(11, function), module.HashMap(11, function)
+                else:
+                    looped, batched = filled(), filled()
+
+                start = time.perf_counter()
+                single(looped)
+                loop_time = min(loop_time, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                batch(batched)
+                batch_time = min(batch_time, time.perf_counter() - start)
+            print(f"{function.__name__:>16} {name:>4} {op:>7} {loop_time:>8.3f} "
+                  f"{batch_time:>8.3f} {loop_time / batch_time:>7.1f}x")
+
+
+class _RecomputedProbeMap(hash_map_oa.HashMap):
+    """
+    An OA HashMap with the per-method probe loops used before _probe() was
+    shared: each step recomputes the index with _probe_index() and reads the
+    bucket through the checked DynamicArray access. The baseline for
+    bench_oa_probe; it assumes no incremental resize or probe histograms.
+    """
+
+    def _find(self, key: object, hash: int) -> int:
+        """Return the bucket index of the live entry for key, or -1."""
+        j = 0
+        index = self._probe_index(hash, j)
+        hash_entry = self._buckets[index]
+        while hash_entry and j < self._capacity:
+            if not hash_entry.is_tombstone and hash_entry.hash == hash and hash_entry.key == key:
+                return index
+            j += 1
+            index = self._probe_index(hash, j)
+            hash_entry = self._buckets[index]
+        return -1
+
+    def get(self, key: str) -> object:
+        """Return the value for key, or None."""
+        index = self._find(key, self._hash_function(key))
+        return None if index == -1 else self._buckets[index].value
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if key is in the map."""
+        return self._size != 0 and self._find(key, self._hash_function(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """Tombstone the entry for key, if there is one."""
+        index = self._find(key, self._hash_function(key))
+        if index != -1:
+            self._remove_at(index)
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """Put a key/value pair whose hash is already known."""
+        j = 0
+        tombstone_index = None
+        index = self._probe_index(hash, j)
+        bucket = self._buckets[index]
+        while bucket and j < self._capacity:
+            if bucket.is_tombstone:
+                if tombstone_index is None:
+                    tombstone_index = index
+            elif bucket.hash == hash and bucket.key == key:
+                bucket.value = value
+                return
+            j += 1
+            index = self._probe_index(hash, j)
+            bucket = self._buckets[index]
+
+        if tombstone_index is not None:
+            index = tombstone_index
+            self._tombstones -= 1
+        elif bucket:
+            self.resize_table(self._capacity * 2)
+            self._put_hashed(key, value, hash)
+            return
+
+        self._buckets[index] = hash_map_oa.HashEntry(key, value, hash)
+        self._size += 1
+        self._modifications += 1
+
+
+def _paired_ns_per_call(fns: list, args: list, batch: int = 100) -> list:
+    """
+    Return the best average time in nanoseconds of calling each of fns once
+    per argument, over short batches of args run by each function in turn.
+    Interleaving the batches exposes every function to the same slow spells
+    of a noisy machine, which separate best-of-n runs do not.
+    """
+    best = [float('inf')] * len(fns)
+    for start in range(0, len(args), batch):
+        chunk = args[start:start + batch]
+        order = list(range(len(fns)))
+        if start // batch % 2:
+            order.reverse()
+        for i in order:
+            ns = _ns_per_call(fns[i], chunk)
+            if ns < best[i]:
+                best[i] = ns
+    return best
+
+
+def bench_oa_probe(capacity: int = 2 ** 16, loads=(0.25, 0.5, 0.75),
+                   samples: int = 30000) -> None:
+    """
+    Time OA get (hits and misses), contains_key, put (updates) and remove of
+    absent keys at fixed load factors, in both probing modes, for the shared
+    _probe() loop and for the recomputed-index loops it replaced
+    (_RecomputedProbeMap). Both maps hold the same keys, so the rows differ
+    only in the probe loop, and speedup is recomputed time over shared time.
+    """
+    print(f"\nOA per-operation time at fixed load, capacity {capacity}")
+    print(f"{'mode':>10} {'load':>5} {'loop':>10} {'get hit':>8} {'get miss':>9} "
+          f"{'contains':>9} {'put upd':>8} {'rm miss':>8}")
+    for power_of_two, load in itertools.product((False, True), loads):
+        # Random keys, since hash(int) is the identity and sequential ints
+        # would fill one contiguous run of buckets.
+        keys = random.sample(range(2 ** 62), 2 * int(capacity * load))
+        stored, absent = keys[:len(keys) // 2], keys[len(keys) // 2:]
+        hits = random.choices(stored, k=samples)
+        misses = random.choices(absent, k=samples)
+        mode = "pow2" if power_of_two else "quadratic"
+
+        maps = []
+        for cls in (hash_map_oa.HashMap, _RecomputedProbeMap):
+            m = cls(capacity, hash, power_of_two=power_of_two,
+                    max_load_factor=0.8, compaction_threshold=0.9)
+            for key in stored:
+                m.put(key, key)
+            maps.append(m)
+
+        # One column per operation, timed on both maps at once.
+        columns = [_paired_ns_per_call([getattr(m, name) for m in maps], args)
+                   for name, args in (('get', hits), ('get', misses),
+                                      ('contains_key', hits), ('remove', misses))]
+        columns.insert(3, _paired_ns_per_call(
+            [lambda key, m=m: m.put(key, key) for m in maps], hits))
+
+        for loop, times in zip(("shared", "recomputed"), zip(*columns)):
+            print(f"{mode:>10} {load:>5.2f} {loop:>10} {times[0]:>8.0f} {times[1]:>9.0f} "
+                  f"{times[2]:>9.0f} {times[3]:>8.0f} {times[4]:>8.0f}")
+        speedups = [recomputed / shared for shared, recomputed in columns]
+        print(f"{mode:>10} {load:>5.2f} {'speedup':>10} {speedups[0]:>7.2f}x {speedups[1]:>8.2f}x "
+              f"{speedups[2]:>8.2f}x {speedups[3]:>7.2f}x {speedups[4]:>7.2f}x")
+
+
+def bench_hash_functions(size: int = 20000, capacity: int = 4093) -> None:
+    """
+    Time every string hash function in the registry, plus a seeded BLAKE2b,
+    and report how evenly each spreads the same keys over capacity buckets.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+    functions = [function for name, function in HASH_FUNCTIONS.items()
+                 if name != 'hash_function_3']
+    functions.append(seeded_hash_function('blake2b', seed=12345))
+
+    print(f"\nHash function throughput and distribution, {size} keys, capacity {capacity}")
+    print(f"{'function':>18} {'ns/key':>8} {'chi2/df':>8} {'largest':>8} {'SC p99':>7}")
+    for function in functions:
+        ns = _ns_per_call(function, keys)
+        result = hash_quality.analyze(function, keys, capacity)
+        print(f"{function.__name__:>18} {ns:>8.0f} {result['chi_square_ratio']:>8.2f} "
+              f"{result['largest_bucket']:>8} {result['sc']['p99']:>7}")
+
+
+def bench_incremental_resize(size: int = 200000) -> None:
+    """
+    Time every put() while growing each map from a small capacity, with
+    one-shot and incremental resizing, and report the latency percentiles.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+
+    print(f"\nput() latency while growing to {size} keys")
+    print(f"{'map':>4} {'resize':>12} {'p50 us':>8} {'p99 us':>8} {'max ms':>8} {'total s':>8}")
+    for (name, module), incremental in itertools.product(
+            (("SC", hash_map_sc), ("OA", hash_map_oa)), (False, True)):
+        m = module.HashMap(11, 'builtin', incremental_resize=incremental)
+        times = []
+        clock = time.perf_counter
+        # Garbage collector pauses would otherwise dominate the maximum.
+        gc.disable()
+        try:
+            for key in keys:
+                start = clock()
+                m.put(key, key)
+                times.append(clock() - start)
+        finally:
+            gc.enable()
+        times.sort()
+        print(f"{name:>4} {'incremental' if incremental else 'one-shot':>12} "
+              f"{times[size // 2] * 1e6:>8.1f} {times[size * 99 // 100] * 1e6:>8.1f} "
+              f"{times[-1] * 1e3:>8.1f} {sum(times):>8.2f}")
+
+
+class _GlobalLockMap:
+    """An SC HashMap behind one lock, the baseline for bench_concurrent."""
+
+    def __init__(self, capacity: int, function) -> None:
+        """Initialize an empty SC HashMap and its lock."""
+        self._map = hash_map_sc.HashMap(capacity, function)
+        self._lock = threading.Lock()
+
+    def put(self, key, value) -> None:
+        """Put under the global lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key) -> object:
+        """Get under the global lock."""
+        with self._lock:
+            return self._map.get(key)
+
+
+def bench_concurrent(size: int = 20000, ops: int = 200000, read_ratio: float = 0.9,
+                     threads=(1, 2, 4, 8)) -> None:
+    """
+    Split ops get/put calls (read_ratio of them gets) across each number of
+    threads and report total throughput for an SC map behind one global lock
+    and for the lock-striped map with lock-free and locked reads. Reads only
+    scale with threads on a free-threaded (no GIL) Python build.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+
+    print(f"\nConcurrent throughput, {read_ratio:.0%} reads, "
+          f"{'GIL enabled' if gil else 'free-threaded'} build")
+    print(f"{'map':>18} {'threads':>8} {'kops/s':>8}")
+    for name, build in (
+            ("global lock", lambda: _GlobalLockMap(size, 'builtin')),
+            ("striped", lambda: hash_map_concurrent.HashMap(size, 'builtin')),
+            ("striped, locked", lambda: hash_map_concurrent.HashMap(size, 'builtin',
+                                                                     lock_reads=True))):
+        for count in threads:
+            m = build()
+            for key in keys:
+                m.put(key, key)
+
+            def work(seed):
+                rng = random.Random(seed)
+                for _ in range(ops // count):
+                    key = keys[rng.randrange(size)]
+                    if rng.random() < read_ratio:
+                        m.get(key)
+                    else:
+                        m.put(key, key)
+
+            workers = [threading.Thread(target=work, args=(n,)) for n in range(count)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18} {count:>8} {ops / elapsed / 1000:>8.0f}")
+
+
+def bench_find_mode(size: int = 10 ** 6, vocabulary: int = 5000) -> None:
+    """
+    Time find_mode on size random words, sequentially and with a process
+    pool of 2, 4, ... up to the number of CPUs, checking the results match.
+    """
+    rng = random.Random(1)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = [''.join(rng.choices(letters, k=8)) for _ in range(vocabulary)]
+    da = DynamicArray(rng.choices(words, k=size))
+
+    print(f"\nfind_mode over {size} words ({vocabulary} distinct), {os.cpu_count()} CPUs")
+    print(f"{'processes':>10} {'s':>8} {'speedup':>8} {'same':>5}")
+    start = time.perf_counter()
+    expected = hash_map_sc.find_mode(da)
+    sequential = time.perf_counter() - start
+    print(f"{1:>10} {sequential:>8.2f} {1:>7.1f}x {'True':>5}")
+
+    processes = 2
+    while processes <= max(2, os.cpu_count()):
+        start = time.perf_counter()
+        result = hash_map_sc.find_mode(da, processes)
+        elapsed = time.perf_counter() - start
+        same = (str(result[0]), result[1]) == (str(expected[0]), expected[1])
+        print(f"{processes:>10} {elapsed:>8.2f} {sequential / elapsed:>7.1f}x {str(same):>5}")
+        processes *= 2
+
+
+def bench_chain_policy(size: int = 10000, load: int = 8, samples: int = 200000,
+                       exponent: float = 1.1) -> None:
+    """
+    Look keys up in an SC map with long chains (load keys per bucket) under a
+    Zipf distribution, and report the chain hops per get() and the time for
+    each chain_policy.
+    """
+    rng = random.Random(1)
+    keys = ['key' + str(i) for i in range(size)]
+    rng.shuffle(keys)
+    # The first keys in the shuffled list are the hot ones.
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    lookups = rng.choices(keys, weights=weights, k=samples)
+
+    print(f"\nSC get() under Zipf({exponent}) access, {size} keys, load {load}")
+    print(f"{'policy':>14} {'mean hops':>10} {'p50':>5} {'p99':>5} {'ns/get':>8}")
+    for policy in (None, 'move_to_front', 'transpose'):
+        m = hash_map_sc.HashMap(size // load, 'builtin', max_load_factor=None,
+                                instrument=True, chain_policy=policy,
+                                treeify_threshold=None)
+        for key in sorted(keys):
+            m.put(key, key)
+        ns = _ns_per_call(m.get, lookups)
+        histogram = m._histograms['get']
+        print(f"{str(policy):>14} {histogram.mean():>10.2f} {histogram.percentile(50):>5} "
+              f"{histogram.percentile(99):>5} {ns:>8.0f}")
+
+
+def bench_treeify(lengths=(100, 1000, 5000), samples: int = 2000) -> None:
+    """
+    Time get() on an SC map whose keys all land in one bucket, as with a
+    flooding attack, with and without converting long chains to SortedChains.
+    """
+    print("\nSC get() with every key in one bucket")
+    print(f"{'chain length':>12} {'list ns/get':>13} {'sorted ns/get':>13}")
+    for length in lengths:
+        lookups = [random.randrange(length) for _ in range(samples)]
+        row = f"{length:>12}"
+        for threshold in (None, 8):
+            m = hash_map_sc.HashMap(1, 'builtin', max_load_factor=None,
+                                    treeify_threshold=threshold)
+            for i in range(length):
+                m.put(i, i)
+            row += f" {_ns_per_call(m.get, lookups):>13.0f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    bench_sc_lookup_scaling()
+    bench_oa_memory()
+    bench_sc_memory()
+    bench_memory_per_entry()
+    bench_bulk_hash()
+    bench_batch_ops()
+    bench_oa_probe()
+    bench_hash_functions()
+    bench_incremental_resize()
+    bench_concurrent()
+    bench_find_mode()
+    bench_chain_policy()
+    bench_treeify()
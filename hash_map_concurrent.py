@@ -0,0 +1,343 @@
+# Description: A thread-safe HashMap with Chaining for collision resolution,
+# built from the same LinkedList buckets as hash_map_sc.HashMap. Writers lock
+# one of a fixed set of stripes (bucket index modulo the number of stripes),
+# so writes to different stripes run in parallel. Reads take no lock by
+# default: a chain is only ever changed by publishing a new head node or
+# relinking one next pointer, and resizes build a new bucket array and swap
+# it in whole, so a reader always walks a consistent chain. A resize takes
+# every stripe lock.
+# The following methods are included:
+#   put()
+#   get()
+#   remove()
+#   contains_key()
+#   clear()
+#   empty_buckets()
+#   resize_table()
+#   table_load()
+#   get_keys()
+
+import threading
+
+from a6_include import (DynamicArray, LinkedList, get_hash_function,
+                        hash_function_1, hash_function_2)
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, stripes: int = 16,
+                 max_load_factor: float = 1.0, lock_reads: bool = False) -> None:
+        """
+        Initialize new thread-safe HashMap that uses
+        separate chaining for collision resolution.
+        function is a hash function or the name of one in
+        a6_include.HASH_FUNCTIONS.
+
+        Writes lock one of stripes locks. The table doubles its capacity when
+        a put() finds the load factor at or above max_load_factor. Reads
+        take no lock unless lock_reads is True, in which case get() and
+        contains_key() also lock the key's stripe.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        if max_load_factor <= 0:
+            raise ValueError("max_load_factor must be positive")
+
+        self._buckets = self._new_buckets(max(1, capacity))
+        self._hash_function = get_hash_function(function)
+        self._max_load_factor = max_load_factor
+        self._lock_reads = lock_reads
+
+        # Each stripe counts its own entries so writers never share a counter.
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._sizes = [0] * stripes
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """Return a bucket array holding capacity empty LinkedLists."""
+        return DynamicArray([LinkedList() for _ in range(capacity)])
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output.
+        """
+        out = ''
+        for i, linked_list in enumerate(self._buckets.raw()):
+            out += str(i) + ': ' + str(linked_list) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map.
+        """
+        return sum(self._sizes)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map.
+        """
+        return self._buckets.length()
+
+    def _lock_bucket(self, hash: int) -> (threading.Lock, int, list):
+        """
+        Acquire the stripe lock for hash and return (lock, stripe, buckets),
+        where buckets is the table that was current once the lock was held.
+        If a resize swapped the table while waiting, the bucket index and so
+        the stripe may have changed, so the lock is retaken.
+        """
+        while True:
+            buckets = self._buckets.raw()
+            stripe = hash % len(buckets) % len(self._locks)
+            lock = self._locks[stripe]
+            lock.acquire()
+            if self._buckets.raw() is buckets:
+                return lock, stripe, buckets
+            lock.release()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the given key
+        already exists in the hash map, its associated value is replaced
+        with the new value. If the given key is not in the hash map, a key/value
+        pair is added.
+
+        Parameters:
+            key: str
+            value: object
+
+        Returns:
+            None
+        """
+        hash = self._hash_function(key)
+        lock, stripe, buckets = self._lock_bucket(hash)
+        try:
+            linked_list = buckets[hash % len(buckets)]
+            node = linked_list.contains(key, hash)
+
+            # Replace the value in place so readers never miss the key.
+            if node:
+                node.value = value
+                return
+            linked_list.insert(key, value, hash)
+            self._sizes[stripe] += 1
+        finally:
+            lock.release()
+
+        if self.table_load() >= self._max_load_factor:
+            self._grow(len(buckets))
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns None.
+
+        Parameters:
+            key: str
+
+        Returns:
+            object
+        """
+        hash = self._hash_function(key)
+        if self._lock_reads:
+            lock, _, buckets = self._lock_bucket(hash)
+            try:
+                node = buckets[hash % len(buckets)].contains(key, hash)
+            finally:
+                lock.release()
+        else:
+            buckets = self._buckets.raw()
+            node = buckets[hash % len(buckets)].contains(key, hash)
+        return node.value if node else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Parameters:
+            key: str
+
+        Returns:
+            True - if the given key is in the hash map.
+            Otherwise returns False.
+        """
+        hash = self._hash_function(key)
+        if self._lock_reads:
+            lock, _, buckets = self._lock_bucket(hash)
+            try:
+                return bool(buckets[hash % len(buckets)].contains(key, hash))
+            finally:
+                lock.release()
+        buckets = self._buckets.raw()
+        return bool(buckets[hash % len(buckets)].contains(key, hash))
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+
+        Parameters:
+            key: str
+
+        Returns:
+            None
+        """
+        hash = self._hash_function(key)
+        lock, stripe, buckets = self._lock_bucket(hash)
+        try:
+            if buckets[hash % len(buckets)].remove(key, hash):
+                self._sizes[stripe] -= 1
+        finally:
+            lock.release()
+
+    def _lock_all(self) -> None:
+        """Acquire every stripe lock, always in the same order."""
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """Release every stripe lock."""
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table. All existing
+        key/value pairs remain in the new hash map, and all the hash
+        table links are rehashed. If new_capacity is less than 1, the method
+        does nothing. Writers wait while the table is rebuilt; readers keep
+        using the old table until the new one is swapped in.
+
+        Parameters:
+            new_capacity: int
+
+        Returns:
+            None
+        """
+        if new_capacity < 1:
+            return
+
+        self._lock_all()
+        try:
+            self._rehash(new_capacity)
+        finally:
+            self._unlock_all()
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Double the table from the given capacity, unless another thread
+        resized it first.
+        """
+        self._lock_all()
+        try:
+            if self.get_capacity() == capacity:
+                self._rehash(capacity * 2)
+        finally:
+            self._unlock_all()
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Rebuild the table at new_capacity and swap it in. Every stripe lock
+        must be held. The old chains are copied, not relinked, so lock-free
+        readers still walking them see every key.
+        """
+        new_buckets = self._new_buckets(new_capacity)
+        new_lists = new_buckets.raw()
+        stripes = len(self._locks)
+        sizes = [0] * stripes
+        for linked_list in self._buckets.raw():
+            for node in linked_list:
+                index = node.hash % new_capacity
+                new_lists[index].insert(node.key, node.value, node.hash)
+                sizes[index % stripes] += 1
+
+        self._sizes = sizes
+        self._buckets = new_buckets
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+
+        Parameters:
+
+        Returns:
+            float
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        Parameters:
+
+        Returns:
+            int
+        """
+        return sum(1 for linked_list in self._buckets.raw() if linked_list.length() == 0)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying
+        hash table capacity.
+
+        Parameters:
+
+        Returns:
+            None
+        """
+        self._lock_all()
+        try:
+            self._buckets = self._new_buckets(self.get_capacity())
+            self._sizes = [0] * len(self._locks)
+        finally:
+            self._unlock_all()
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Parameters:
+
+        Returns:
+            DynamicArray - contains all the keys stored in the hash map,
+            as of a single moment (writers wait while it is built).
+        """
+        array_of_keys = DynamicArray()
+        self._lock_all()
+        try:
+            for linked_list in self._buckets.raw():
+                for node in linked_list:
+                    array_of_keys.append(node.key)
+        finally:
+            self._unlock_all()
+        return array_of_keys
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove")
+    print("------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.contains_key('str42'), m.contains_key('str150'))
+    m.remove('str42')
+    print(m.get('str42'), m.contains_key('str42'), m.get_size())
+
+    print("\nconcurrent writers")
+    print("------------------")
+    m = HashMap(11, hash_function_2, stripes=8)
+
+    def writer(start):
+        for i in range(start, start + 2000):
+            m.put(str(i), i)
+        for i in range(start, start + 2000, 2):
+            m.remove(str(i))
+
+    threads = [threading.Thread(target=writer, args=(n * 2000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_keys().length(), m.get_capacity(),
+          all(m.get(str(i)) == (None if i % 2 == 0 else i) for i in range(8000)))
@@ -0,0 +1,279 @@
+# Description: Snapshots of the Open Addressing HashMap on disk. save() writes
+# the bucket array as a fixed-size slot table (hash, key/value offsets and
+# slot state) followed by the pickled keys and values. MappedHashMap opens such
+# a file read-only with mmap and serves lookups straight from the mapped pages,
+# walking the same probe sequence as the map that wrote it, so nothing is
+# rebuilt on load and processes that open the same file share one copy.
+# The following functions and methods are included:
+#   save()
+#   MappedHashMap.get()
+#   MappedHashMap.contains_key()
+#   MappedHashMap.get_size()
+#   MappedHashMap.get_capacity()
+#   MappedHashMap.table_load()
+#   MappedHashMap.keys()
+#   MappedHashMap.values()
+#   MappedHashMap.items()
+#   MappedHashMap.close()
+
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import HASH_FUNCTIONS, get_hash_function
+
+# File layout: a 64 byte header, then one 32 byte slot per bucket, then the
+# pickled keys and values. Integers are little-endian.
+#   header: magic, capacity, size, probe mode, hash function name
+#   slot:   hash (mod 2^64), key offset into the data, key length,
+#           value length (the value follows its key), state
+_MAGIC = b'A6OAMAP1'
+_HEADER = struct.Struct('<8sQQB31s8x')
+_SLOT = struct.Struct('<QQIIB7x')
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+# Slot states.
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# Probe sequences, as named by hash_map_oa.HashMap._probe_mode().
+_PROBE_MODES = ('quadratic', 'triangular', 'linear')
+
+
+def save(hash_map, path: str) -> None:
+    """
+    Writes a snapshot of an Open Addressing HashMap (or a subclass) to path.
+    The file is written under a temporary name and renamed into place, so a
+    reader never sees a partial snapshot. The hash function's name is stored
+    if it is in a6_include.HASH_FUNCTIONS.
+
+    Parameters:
+        hash_map: hash_map_oa.HashMap
+        path: str
+
+    Returns:
+        None
+    """
+    capacity = hash_map.get_capacity()
+    function_name = ''
+    for name, function in HASH_FUNCTIONS.items():
+        if function is hash_map._hash_function:
+            function_name = name
+
+    slots = bytearray(_SLOT.size * capacity)
+    data = bytearray()
+    for index, hash_entry in enumerate(hash_map._buckets.raw()):
+        if hash_entry is None:
+            continue
+        if hash_entry.is_tombstone:
+            _SLOT.pack_into(slots, index * _SLOT.size, hash_entry.hash & _MASK_64,
+                            0, 0, 0, TOMBSTONE)
+            continue
+        key = pickle.dumps(hash_entry.key, pickle.HIGHEST_PROTOCOL)
+        value = pickle.dumps(hash_entry.value, pickle.HIGHEST_PROTOCOL)
+        _SLOT.pack_into(slots, index * _SLOT.size, hash_entry.hash & _MASK_64,
+                        len(data), len(key), len(value), LIVE)
+        data += key
+        data += value
+
+    header = _HEADER.pack(_MAGIC, capacity, hash_map.get_size(),
+                          _PROBE_MODES.index(hash_map._probe_mode()),
+                          function_name.encode())
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as snapshot:
+        snapshot.write(header)
+        snapshot.write(slots)
+        snapshot.write(data)
+    os.replace(temporary_path, path)
+
+
+class MappedHashMap:
+    """
+    Read-only HashMap over a snapshot written by save(). Keys and values are
+    unpickled on access, so only open snapshots from a trusted source.
+    """
+
+    def __init__(self, path: str, function=None) -> None:
+        """
+        Map the snapshot at path. function is the hash function the map was
+        built with, or its name; it may be omitted if the snapshot recorded
+        the name. The function must give the same hashes as when the snapshot
+        was written, which Python's builtin hash() does not do for str keys
+        across processes unless PYTHONHASHSEED is fixed.
+        """
+        with open(path, 'rb') as snapshot:
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, capacity, size, probe_mode, function_name = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(path + " is not a HashMap snapshot")
+
+        if function is None:
+            function = function_name.rstrip(b'\0').decode()
+            if not function:
+                self._mmap.close()
+                raise ValueError("snapshot does not name its hash function; pass function")
+
+        self._hash_function = get_hash_function(function)
+        self._capacity = capacity
+        self._size = size
+        self._probe_mode = _PROBE_MODES[probe_mode]
+        self._data_offset = _HEADER.size + _SLOT.size * capacity
+
+    def __enter__(self) -> "MappedHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmap the snapshot at the end of a with statement."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the snapshot. The map cannot be used afterwards.
+
+        Parameters:
+
+        Returns:
+            None
+        """
+        self._mmap.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map.
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map.
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        This method returns the hash table load factor.
+
+        Parameters:
+
+        Returns:
+            float
+        """
+        return self._size / self._capacity
+
+    def _load(self, offset: int, length: int) -> object:
+        """Unpickle the object stored at offset in the data section."""
+        start = self._data_offset + offset
+        return pickle.loads(self._mmap[start:start + length])
+
+    def _find(self, key: object) -> tuple:
+        """
+        Walk the probe sequence for key and return its slot as
+        (hash, key offset, key length, value length, state), or None.
+        """
+        hash = self._hash_function(key)
+        stored_hash = hash & _MASK_64
+        capacity = self._capacity
+        mask = capacity - 1
+        mode = self._probe_mode
+        index = hash % capacity if mode == 'quadratic' else hash & mask
+
+        for j in range(1, capacity + 1):
+            slot = _SLOT.unpack_from(self._mmap, _HEADER.size + index * _SLOT.size)
+            state = slot[4]
+            if state == EMPTY:
+                return None
+            # Hashes are compared first so mismatches skip unpickling the key.
+            if state == LIVE and slot[0] == stored_hash and self._load(slot[1], slot[2]) == key:
+                return slot
+
+            if mode == 'triangular':
+                index = (index + j) & mask
+            elif mode == 'quadratic':
+                index = (index + 2 * j - 1) % capacity
+            else:
+                index = (index + 1) & mask
+        return None
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns None.
+
+        Parameters:
+            key: str
+
+        Returns:
+            object
+        """
+        slot = self._find(key)
+        return None if slot is None else self._load(slot[1] + slot[2], slot[3])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Parameters:
+            key: str
+
+        Returns:
+            True - if the given key is in the hash map.
+            Otherwise returns False.
+        """
+        if self._size == 0:
+            return False
+        return self._find(key) is not None
+
+    def _slots(self):
+        """Yield the live slots of the snapshot in bucket order."""
+        for index in range(self._capacity):
+            slot = _SLOT.unpack_from(self._mmap, _HEADER.size + index * _SLOT.size)
+            if slot[4] == LIVE:
+                yield slot
+
+    def __iter__(self):
+        """Return an iterator over the keys in the hash map."""
+        return self.keys()
+
+    def keys(self):
+        """Return a lazy iterator over the keys in the hash map."""
+        for slot in self._slots():
+            yield self._load(slot[1], slot[2])
+
+    def values(self):
+        """Return a lazy iterator over the values in the hash map."""
+        for slot in self._slots():
+            yield self._load(slot[1] + slot[2], slot[3])
+
+    def items(self):
+        """Return a lazy iterator over the (key, value) pairs in the hash map."""
+        for slot in self._slots():
+            yield self._load(slot[1], slot[2]), self._load(slot[1] + slot[2], slot[3])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    import hash_map_oa
+
+    print("\nsave / MappedHashMap")
+    print("--------------------")
+    m = hash_map_oa.HashMap(50, 'fnv1a', power_of_two=True)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    for i in range(0, 150, 7):
+        m.remove('str' + str(i))
+
+    path = os.path.join(tempfile.mkdtemp(), 'map.bin')
+    m.save(path)
+    with MappedHashMap(path) as mapped:
+        print(mapped.get_size(), mapped.get_capacity(), os.path.getsize(path))
+        print(mapped.get('str43'), mapped.contains_key('str42'), mapped.get('str150'))
+        print(all(mapped.get(key) == m.get(key) for key in m.keys()),
+              sorted(mapped.items()) == sorted(m.items()))
@@ -10,25 +10,109 @@
 #   empty_buckets()
 #   resize_table()
 #   table_load()
+#   tombstone_ratio()
+#   stats()
+#   probe_report()
 #   get_keys()
+#   save()
+#   from_iterable()
+#   put_many()
+#   get_many()
+#   remove_many()
+#   keys()
+#   values()
+#   items()
 
-from a6_include import (DynamicArray, HashEntry,
-                        hash_function_1, hash_function_2)
+import itertools
+import time
+
+import hash_map_mmap
+from a6_include import (DynamicArray, HashEntry, ProbeHistogram, get_hash_function,
+                        hash_many, hash_function_1, hash_function_2)
+
+# Number of old buckets each operation moves over during an incremental resize.
+_MIGRATE_BUCKETS = 8
+
+# Left in the old table in place of an entry that has moved to the new one,
+# so probe sequences through that bucket carry on past it.
+_MOVED = HashEntry(None, None)
+_MOVED.is_tombstone = True
+
+
+def _next_power_of_two(n: int) -> int:
+    """Return the smallest power of two that is greater than or equal to n."""
+    return 1 << max(0, n - 1).bit_length()
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, power_of_two: bool = False,
+                 max_load_factor: float = 0.5,
+                 compaction_threshold: float = 0.75,
+                 instrument: bool = False,
+                 incremental_resize: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution.
+        function is a hash function or the name of one in
+        a6_include.HASH_FUNCTIONS, e.g. 'blake2b'.
+
+        If power_of_two is True, the capacity is always rounded up to a power
+        of two, indices are taken with a bitmask and the probe sequence steps
+        by triangular numbers (j * (j + 1) / 2), which visits every bucket.
+
+        The table doubles once put() finds the load factor at or above
+        max_load_factor. Once live entries plus tombstones fill
+        compaction_threshold of the table, put() first rehashes it at the
+        same capacity to drop the tombstones.
+
+        If instrument is True, the number of buckets each get, put, remove
+        and contains_key call examines is recorded, along with the number
+        and duration of resizes; see probe_report().
+
+        If incremental_resize is True, the resizes and compactions triggered
+        by put() do not rehash everything at once. The old bucket array is
+        kept, and each following get, put, remove and contains_key call moves
+        a few of its buckets into the new one until it is empty; keys not
+        found in the new table are looked up in the old one meanwhile.
         """
-        self._buckets = DynamicArray()
-        for _ in range(capacity):
-            self._buckets.append(None)
+        if not 0 < max_load_factor < 1:
+            raise ValueError("max_load_factor must be between 0 and 1")
+        if not max_load_factor < compaction_threshold <= 1:
+            raise ValueError("compaction_threshold must be in (max_load_factor, 1]")
+
+        self._power_of_two = power_of_two
+        self._max_load_factor = max_load_factor
+        self._compaction_threshold = compaction_threshold
+        if power_of_two:
+            capacity = _next_power_of_two(capacity)
+
+        self._buckets = DynamicArray.filled(capacity)
 
         self._capacity = capacity
-        self._hash_function = function
+        self._mask = capacity - 1
+        self._hash_function = get_hash_function(function)
         self._size = 0
+        self._tombstones = 0
+        self._modifications = 0
+
+        # Longest probe sequence walked by an insert since the last resize or clear.
+        self._max_probe_length = 0
+
+        # Probe histograms per operation, or None when instrumentation is off
+        # so the hot paths only pay for one comparison.
+        self._histograms = None
+        if instrument:
+            self._histograms = {name: ProbeHistogram()
+                                for name in ('get', 'put', 'remove', 'contains_key')}
+        self._resizes = 0
+        self._resize_seconds = 0.0
+
+        # During an incremental resize, the old bucket list, the index of its
+        # first bucket not yet moved and the number of live entries left in it.
+        self._incremental_resize = incremental_resize
+        self._old_buckets = None
+        self._migrate_index = 0
+        self._old_size = 0
 
     def __str__(self) -> str:
         """
@@ -51,6 +135,19 @@ class HashMap:
         """
         return self._capacity
 
+    def _probe_index(self, hash: int, j: int) -> int:
+        """
+        Return the bucket index of the j-th probe for the given hash
+        (j = 0 is the home bucket).
+        """
+        if self._power_of_two:
+            return (hash + (j * (j + 1) // 2)) & self._mask
+        return (hash + (j * j)) % self._capacity
+
+    def _probe_mode(self) -> str:
+        """Name of the probe sequence, as recorded in snapshots by save()."""
+        return 'triangular' if self._power_of_two else 'quadratic'
+
     def put(self, key: str, value: object) -> None:
         """
         Updates the key/value pair in the hash map. If the given key
@@ -59,7 +156,8 @@ class HashMap:
         pair is added.
 
         The table is resized to double its current capacity when this method is called
-        and the current load factor of the table is greater than or equal to 0.5
+        and the current load factor of the table is greater than or equal to
+        max_load_factor (0.5 by default).
 
         Parameters:
             key: str
@@ -68,57 +166,67 @@ class HashMap:
         Returns:
             None
         """
-        # If the load factor is greater than or equal to 0.5,
+        # If the load factor is greater than or equal to the maximum,
         # resize the table before putting the new key/value pair
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        if self._old_buckets is not None:
+            self._migrate(_MIGRATE_BUCKETS)
 
-        # Get the hashed index of the map
-        hash = self._hash_function(key)
-        index = hash % self._capacity
+        new_capacity = self._capacity_for_put()
+        if new_capacity:
+            self._resize(new_capacity)
 
-        # If that bucket is empty.
-        if not self._buckets[index]:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
+        # Get the hash of the key. It is cached on the HashEntry so
+        # resize_table() never re-runs the hash function.
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _capacity_for_put(self) -> int:
+        """
+        Return the capacity to resize to before adding a key, or 0 if the
+        table has room: double if the load factor has reached the maximum,
+        the same capacity if live entries plus tombstones fill too much of the
+        table (rehashing drops the tombstones, so misses don't probe through them).
+        """
+        if self.table_load() >= self._max_load_factor:
+            return self._capacity * 2
+        if self._tombstones and \
+                (self._size + self._tombstones) / self._capacity >= self._compaction_threshold:
+            return self._capacity
+        return 0
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Put a key/value pair whose hash is already known, without checking
+        the load factor first.
+        """
+        index, hash_entry, probes = self._probe(key, hash)
+        if probes > self._max_probe_length:
+            self._max_probe_length = probes
+        if self._histograms is not None:
+            self._histograms['put'].record(probes)
 
         # If the given key already exists in the hash map.
-        elif self._buckets[index].key == key:
-            self._buckets[index].value = value
-            if self._buckets[index].is_tombstone is True:
-                self._buckets[index].is_tombstone = False
-                self._size += 1
-
-        # If the index is a tombstone
-        elif self._buckets[index].is_tombstone is True:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
+        if hash_entry is not None:
+            hash_entry.value = value
+            return
 
-        # If that bucket is taken by another key
-        # Use quadratic probing ((index + j^2) % self._capacity where j = 1, 2, 3, ...)
-        else:
-            j = 1
-            # Break statements:
-            #   1. while the bucket is not None.
-            #   2. while the bucket's key is not the passed key.
-            #   3. while the bucket is not a tombstone.
-            while self._buckets[(hash + (j * j)) % self._capacity] and \
-                self._buckets[(hash + (j * j)) % self._capacity].key != key and \
-                    self._buckets[(hash + (j * j)) % self._capacity].is_tombstone is False:
-                j += 1
-
-            # If the bucket at the found index in not None.
-            if self._buckets[(hash + (j * j)) % self._capacity]:
-                # If the bucket's key is the passed key
-                if self._buckets[(hash + (j * j)) % self._capacity].key == key:
-                    # Update the value without increasing the size (unless it's a tombstone).
-                    self._buckets[(hash + (j * j)) % self._capacity].value = value
-                    if self._buckets[index].is_tombstone is True:
-                        self._buckets[index].is_tombstone = False
-                        self._size += 1
-            else:
-                self._buckets[(hash + (j * j)) % self._capacity] = HashEntry(key, value)
-                self._size += 1
+        # Every bucket the probe sequence can reach is taken; grow and retry.
+        if index == -1:
+            self.resize_table(self._capacity * 2)
+            self._put_hashed(key, value, hash)
+            return
+
+        # The new entry reuses a tombstone if the probe passed one.
+        buckets = self._buckets.raw()
+        if buckets[index] is not None:
+            self._tombstones -= 1
+        buckets[index] = HashEntry(key, value, hash)
+
+        # During an incremental resize the key may still be in the old table;
+        # if so, it has just moved rather than been added.
+        if self._old_buckets is not None and self._take_old(key, hash) is not None:
+            return
+        self._size += 1
+        self._modifications += 1
 
     def table_load(self) -> float:
         """
@@ -132,6 +240,58 @@ class HashMap:
 
         return self._size / self._capacity
 
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the table's statistics, in constant time:
+        size, capacity, load, empty_buckets, tombstones, and max_probe_length,
+        the longest probe sequence walked by a put since the last resize or clear.
+
+        Parameters:
+
+        Returns:
+            dict
+        """
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': self.empty_buckets(),
+            'tombstones': self._tombstones,
+            'max_probe_length': self._max_probe_length,
+        }
+
+    def probe_report(self) -> dict:
+        """
+        Returns the instrumentation data: for each of get, put, remove and
+        contains_key, the number of calls and the p50, p99 and max number of
+        buckets examined, plus the number of resizes and their total time in
+        seconds. Returns None if the map was created without instrument=True.
+
+        Parameters:
+
+        Returns:
+            dict
+        """
+        if self._histograms is None:
+            return None
+
+        report = {name: histogram.summary() for name, histogram in self._histograms.items()}
+        report['resizes'] = self._resizes
+        report['resize_seconds'] = self._resize_seconds
+        return report
+
+    def tombstone_ratio(self) -> float:
+        """
+        This method returns the fraction of buckets holding tombstones.
+
+        Parameters:
+
+        Returns:
+            float
+        """
+
+        return self._tombstones / self._capacity
+
     def empty_buckets(self) -> int:
         """
         Returns the number of empty buckets in the hash table.
@@ -142,13 +302,7 @@ class HashMap:
             int
         """
 
-        num_empty_buckets = 0
-
-        for i in range(0, self._capacity):
-            if self._buckets[i] is None:
-                num_empty_buckets += 1
-
-        return num_empty_buckets
+        return self._capacity - (self._size - self._old_size) - self._tombstones
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -168,27 +322,215 @@ class HashMap:
         if new_capacity < 1 or new_capacity < self._size:
             return
 
-        # Copy current bucket to temp_bucket array to save data.
-        temp_buckets = DynamicArray()
-        for i in range(0, self._capacity):
-            temp_buckets.append(self._buckets[i])
+        self._finish_migration()
+        new_capacity = self._fit_capacity(new_capacity)
+        if self._histograms is not None:
+            start = time.perf_counter()
 
-        new_buckets = DynamicArray()
-        for _ in range(new_capacity):
-            new_buckets.append(None)
+        # Moves over all entries that have not been deleted (by checking is_tombstone
+        # variable), reusing each entry's cached hash instead of calling put().
+        entries = [hash_entry for hash_entry in self._buckets.raw()
+                   if hash_entry and hash_entry.is_tombstone is False]
+        self._rehash_entries(entries, new_capacity)
 
-        # Save old capacity and update to new capacity and buckets.
-        old_capacity = self._capacity
+        if self._histograms is not None:
+            self._resizes += 1
+            self._resize_seconds += time.perf_counter() - start
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Return the capacity to resize to for a requested new_capacity: doubled
+        until the load factor is below the maximum, and rounded up to a power
+        of two in that mode.
+        """
+        while self._size >= new_capacity * self._max_load_factor:
+            new_capacity *= 2
+        if self._power_of_two:
+            new_capacity = _next_power_of_two(new_capacity)
+        return new_capacity
+
+    def _switch_buckets(self, new_capacity: int) -> list:
+        """
+        Replace the bucket array with an empty one of new_capacity and return
+        the old array's backing list. Does not move any entries.
+        """
+        old_buckets = self._buckets.raw()
         self._capacity = new_capacity
-        self._buckets = new_buckets
-        self._size = 0
+        self._mask = new_capacity - 1
+        self._buckets = DynamicArray.filled(new_capacity)
+        self._tombstones = 0
+        self._modifications += 1
+        self._max_probe_length = 0
+        return old_buckets
+
+    def _rehash_entries(self, entries: list, new_capacity: int) -> None:
+        """
+        Switch to an empty table of new_capacity and insert the entries into
+        it. Quadratic probing does not reach every bucket, so if an entry
+        finds no empty bucket on its probe sequence, the table is doubled and
+        the rehash starts over.
+        """
+        self._switch_buckets(new_capacity)
+        while not all(self._insert_entry(hash_entry) for hash_entry in entries):
+            self._switch_buckets(self._fit_capacity(self._capacity * 2))
+
+    def _resize(self, new_capacity: int) -> None:
+        """Resize the table, incrementally if the map was created that way."""
+        if not self._incremental_resize:
+            self.resize_table(new_capacity)
+            return
 
-        # Copies over all values that have not been deleted (by checking is_tombstone variable).
-        for i in range(0, old_capacity):
-            if temp_buckets[i] and temp_buckets[i].is_tombstone is False:
-                self.put(temp_buckets[i].key, temp_buckets[i].value)
+        self._finish_migration()
+        if self._histograms is not None:
+            self._resizes += 1
+        self._old_buckets = self._switch_buckets(self._fit_capacity(new_capacity))
+        self._migrate_index = 0
+        self._old_size = self._size
+
+    def _migrate(self, count: int) -> None:
+        """
+        Move the live entries in the next count buckets of the old table into
+        the new one, dropping the old table once every bucket has been moved.
+        """
+        old_buckets = self._old_buckets
+        end = min(self._migrate_index + count, len(old_buckets))
+        for index in range(self._migrate_index, end):
+            hash_entry = old_buckets[index]
+            if hash_entry and not hash_entry.is_tombstone:
+                if not self._insert_entry(hash_entry):
+                    # No empty bucket on its probe sequence: move everything
+                    # left into a larger table at once.
+                    entries = [entry for entry in old_buckets + self._buckets.raw()
+                               if entry and not entry.is_tombstone]
+                    self._old_buckets = None
+                    self._old_size = 0
+                    self._rehash_entries(entries, self._fit_capacity(self._capacity * 2))
+                    return
+                old_buckets[index] = _MOVED
+                self._old_size -= 1
+
+        self._migrate_index = end
+        if end == len(old_buckets):
+            self._old_buckets = None
+
+    def _finish_migration(self) -> None:
+        """Complete any incremental resize in progress."""
+        if self._old_buckets is not None:
+            self._migrate(len(self._old_buckets))
+
+    def _find_old(self, key: object, hash: int) -> int:
+        """
+        Return the index of the live entry for key in the old table of an
+        incremental resize, or -1 if it is not there.
+        """
+        buckets = self._old_buckets
+        capacity = len(buckets)
+        mask = capacity - 1
+        index = hash & mask if self._power_of_two else hash % capacity
+        for j in range(1, capacity + 1):
+            hash_entry = buckets[index]
+            if hash_entry is None:
+                return -1
+            if not hash_entry.is_tombstone and hash_entry.hash == hash and hash_entry.key == key:
+                return index
+            if self._power_of_two:
+                index = (index + j) & mask
             else:
-                continue
+                index = (index + 2 * j - 1) % capacity
+        return -1
+
+    def _take_old(self, key: object, hash: int) -> HashEntry:
+        """
+        Remove the entry for key from the old table of an incremental resize
+        and return it, or return None if it is not there. Does not update the size.
+        """
+        index = self._find_old(key, hash)
+        if index == -1:
+            return None
+        hash_entry = self._old_buckets[index]
+        self._old_buckets[index] = _MOVED
+        self._old_size -= 1
+        return hash_entry
+
+    def _insert_entry(self, hash_entry: HashEntry) -> bool:
+        """
+        Place an entry whose key is known to be absent into the first
+        empty bucket of its probe sequence. Does not update the size.
+        Returns False, placing nothing, if none of the first capacity
+        buckets of the sequence is empty.
+        """
+        buckets = self._buckets.raw()
+        for j in range(self._capacity):
+            index = self._probe_index(hash_entry.hash, j)
+            if not buckets[index]:
+                buckets[index] = hash_entry
+                if j + 1 > self._max_probe_length:
+                    self._max_probe_length = j + 1
+                return True
+        return False
+
+    def _probe(self, key: object, hash: int) -> (int, HashEntry, int):
+        """
+        Walk the probe sequence for key, computing and reading each bucket once.
+
+        Returns (index, entry, probes) if the live entry for key is at index.
+        Otherwise returns (index, None, probes) where index is the bucket a new
+        entry for key belongs in: the first tombstone passed, or else the empty
+        bucket that ended the search; index is -1 if every reachable bucket is
+        taken. probes is the number of buckets read.
+        """
+        buckets = self._buckets.raw()
+        capacity = self._capacity
+
+        # Most lookups end at the home bucket, so it is checked before any
+        # loop state is set up. hash % capacity equals hash & mask for a
+        # power-of-two capacity, negative hashes included.
+        index = hash % capacity
+        hash_entry = buckets[index]
+        if hash_entry is None:
+            return index, None, 1
+        if hash_entry.is_tombstone:
+            tombstone_index = index
+        elif hash_entry.hash == hash and hash_entry.key == key:
+            return index, hash_entry, 1
+        else:
+            tombstone_index = -1
+
+        # The offsets from the home bucket are triangular numbers
+        # (j * (j + 1) / 2), which grow by j, or squares (j^2), which grow by
+        # 2j - 1, so each step adds the next value of a range and neither mode
+        # needs a branch inside the loop.
+        steps = range(1, capacity) if self._power_of_two else range(1, 2 * capacity - 2, 2)
+        for probes, step in enumerate(steps, 2):
+            index = (index + step) % capacity
+            hash_entry = buckets[index]
+            if hash_entry is None:
+                return (index if tombstone_index == -1 else tombstone_index), None, probes
+
+            if hash_entry.is_tombstone:
+                if tombstone_index == -1:
+                    tombstone_index = index
+
+            # Hashes are compared first so mismatches skip the key comparison.
+            elif hash_entry.hash == hash and hash_entry.key == key:
+                return index, hash_entry, probes
+
+        return tombstone_index, None, capacity
+
+    def _find(self, key: object, hash: int) -> int:
+        """
+        Return the index of the bucket holding the live entry for key,
+        or -1 if the key is not in the hash map.
+        """
+        index, hash_entry, _ = self._probe(key, hash)
+        return -1 if hash_entry is None else index
+
+    def _remove_at(self, index: int) -> None:
+        """Delete the live entry at the given bucket index by marking it a tombstone."""
+        self._buckets.raw()[index].is_tombstone = True
+        self._size -= 1
+        self._modifications += 1
+        self._tombstones += 1
 
     def get(self, key: str) -> object:
         """
@@ -201,68 +543,46 @@ class HashMap:
         Returns:
             object
         """
+        if self._old_buckets is not None:
+            self._migrate(_MIGRATE_BUCKETS)
 
-        # Get the hashed index of the map
         hash = self._hash_function(key)
-        index = hash % self._capacity
-        hash_entry = self._buckets[index]
-
-        if hash_entry:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                return hash_entry.value
-
-            # Check if the requested key has been shifted to an open address.
-            else:
-                j = 1
-                while self._buckets[(hash + (j * j)) % self._capacity] and \
-                    self._buckets[(hash + (j * j)) % self._capacity].key != key and \
-                        self._buckets[(hash + (j * j)) % self._capacity].is_tombstone is False:
-                    j += 1
-
-                probed_bucket = self._buckets[(hash + (j * j)) % self._capacity]
-                if probed_bucket:
-                    if probed_bucket.key == key and not probed_bucket.is_tombstone:
-                        return self._buckets[(hash + (j * j)) % self._capacity].value
+        _, hash_entry, probes = self._probe(key, hash)
+        if self._histograms is not None:
+            self._histograms['get'].record(probes)
 
-        return None
+        # Keys not yet moved by an incremental resize are in the old table.
+        if hash_entry is None and self._old_buckets is not None:
+            index = self._find_old(key, hash)
+            if index != -1:
+                hash_entry = self._old_buckets[index]
+        return None if hash_entry is None else hash_entry.value
 
     def contains_key(self, key: str) -> bool:
         """
-        Returns the value associated with the given key.
-        If the key is not in the hash map, the method returns None.
-
         Parameters:
             key: str
 
         Returns:
-            object
+            True - if the given key is in the hash map.
+            Otherwise returns False.
         """
         if self._size == 0:
+            if self._histograms is not None:
+                self._histograms['contains_key'].record(0)
             return False
 
-        # Get the hashed index of the map
-        hash = self._hash_function(key)
-        index = hash % self._capacity
+        if self._old_buckets is not None:
+            self._migrate(_MIGRATE_BUCKETS)
 
-        # If the original hashed index contains requested key.
-        if self._buckets[index]:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                return True
-
-            # Check if the requested key has been shifted to an open address.
-            else:
-                j = 1
-                while self._buckets[(hash + (j * j)) % self._capacity] and \
-                    self._buckets[(hash + (j * j)) % self._capacity].key != key and \
-                        self._buckets[(hash + (j * j)) % self._capacity].is_tombstone is False:
-                    j += 1
-
-                probed_bucket = self._buckets[(hash + (j * j)) % self._capacity]
-                if probed_bucket:
-                    if probed_bucket.key == key and not probed_bucket.is_tombstone:
-                        return True
+        hash = self._hash_function(key)
+        _, hash_entry, probes = self._probe(key, hash)
+        if self._histograms is not None:
+            self._histograms['contains_key'].record(probes)
 
-        return False
+        if hash_entry is None and self._old_buckets is not None:
+            return self._find_old(key, hash) != -1
+        return hash_entry is not None
 
     def remove(self, key: str) -> None:
         """
@@ -275,31 +595,22 @@ class HashMap:
         Returns:
             None
         """
-        # Get the hashed index of the map
+        if self._old_buckets is not None:
+            self._migrate(_MIGRATE_BUCKETS)
+
         hash = self._hash_function(key)
-        index = hash % self._capacity
+        index, hash_entry, probes = self._probe(key, hash)
+        if self._histograms is not None:
+            self._histograms['remove'].record(probes)
 
-        # If the hashed index value is our target and not already deleted...
-        if self._buckets[index]:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                # ... It is deleted.
-                self._buckets[index].is_tombstone = True
-                self._size -= 1
+        # If the key is in the hash map, its entry becomes a tombstone.
+        if hash_entry is not None:
+            self._remove_at(index)
 
-            # Else, check if the requested key has been shifted to an open address.
-            else:
-                j = 1
-                while self._buckets[(hash + (j * j)) % self._capacity] and \
-                        self._buckets[(hash + (j * j)) % self._capacity].key != key:
-                    j += 1
-
-                # If the probed hashed value is our target and not already deleted...
-                probed_bucket = self._buckets[(hash + (j * j)) % self._capacity]
-                if probed_bucket:
-                    if probed_bucket.key == key and not probed_bucket.is_tombstone:
-                        # ... It is deleted.
-                        self._buckets[(hash + (j * j)) % self._capacity].is_tombstone = True
-                        self._size -= 1
+        # Keys not yet moved by an incremental resize are in the old table.
+        elif self._old_buckets is not None and self._take_old(key, hash) is not None:
+            self._size -= 1
+            self._modifications += 1
 
     def clear(self) -> None:
         """
@@ -311,12 +622,227 @@ class HashMap:
         Returns:
             None
         """
-        new_buckets = DynamicArray()
-        for i in range(0, self._capacity):
-            new_buckets.append(None)
-
         self._size = 0
-        self._buckets = new_buckets
+        self._tombstones = 0
+        self._modifications += 1
+        self._max_probe_length = 0
+        self._old_buckets = None
+        self._old_size = 0
+        self._buckets = DynamicArray.filled(self._capacity)
+
+    @classmethod
+    def from_iterable(cls, iterable, function, size_hint: int = None,
+                      chunk_size: int = 4096, **options) -> "HashMap":
+        """
+        Builds a hash map from an iterable of (key, value) pairs, such as a
+        generator over a large file. The input is consumed chunk_size pairs at
+        a time through put_many(), so no more than one chunk of it is held in
+        memory. If size_hint (the expected number of distinct keys) is given,
+        the table is sized for it up front; after that, each chunk only grows
+        the table for keys that are new, so repeated keys take no extra room.
+        options are passed to the constructor.
+
+        Parameters:
+            iterable: iterable of (key, value)
+            function: hash function or its name
+            size_hint: int
+            chunk_size: int
+
+        Returns:
+            HashMap
+        """
+        hash_map = cls(11, function, **options)
+        if size_hint:
+            hash_map._reserve(size_hint)
+
+        iterator = iter(iterable)
+        chunk = list(itertools.islice(iterator, chunk_size))
+        while chunk:
+            hash_map.put_many(chunk)
+            chunk = list(itertools.islice(iterator, chunk_size))
+        return hash_map
+
+    def _reserve(self, count: int) -> None:
+        """
+        Prepare the table for count more new entries: grow it with a single
+        resize so the load factor stays below the maximum, or else compact it
+        if tombstones have piled up.
+        """
+        new_capacity = self._capacity
+        while self._size + count >= new_capacity * self._max_load_factor:
+            new_capacity *= 2
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+        elif self._tombstones and \
+                (self._size + self._tombstones) / self._capacity >= self._compaction_threshold:
+            self.resize_table(self._capacity)
+
+    def put_many(self, pairs) -> None:
+        """
+        Puts every (key, value) pair of the iterable into the hash map, as if
+        put() were called for each in order. All keys are hashed in one batch,
+        and the table is only resized for keys that turn out to be new.
+
+        Parameters:
+            pairs: iterable of (key, value)
+
+        Returns:
+            None
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        self._finish_migration()
+        keys = [key for key, _ in pairs]
+        # However many existing keys the batch repeats, at least this many of
+        # its keys are new, so the table is grown for them in one resize.
+        self._reserve(len(set(keys)) - self._size)
+        hashes = hash_many(self._hash_function, keys)
+        histograms = self._histograms
+        buckets = None
+        for (key, value), hash in zip(pairs, hashes):
+            # Fetched again whenever _put_hashed() may have resized the table.
+            if buckets is None:
+                buckets = self._buckets.raw()
+                capacity = self._capacity
+                steps = range(1, capacity + 1) if self._power_of_two else range(1, 2 * capacity, 2)
+
+            # _probe() inlined, as in _find_each(). index ends at the empty
+            # bucket that stopped the search, or -1 if every reachable bucket
+            # is taken.
+            index = hash % capacity
+            tombstone_index = -1
+            found = None
+            for probes, step in enumerate(steps, 1):
+                hash_entry = buckets[index]
+                if hash_entry is None:
+                    break
+                if hash_entry.is_tombstone:
+                    if tombstone_index == -1:
+                        tombstone_index = index
+                elif hash_entry.hash == hash and hash_entry.key == key:
+                    found = hash_entry
+                    break
+                index = (index + step) % capacity
+            else:
+                index = -1
+            if probes > self._max_probe_length:
+                self._max_probe_length = probes
+            if histograms is not None:
+                histograms['put'].record(probes)
+
+            if found is not None:
+                found.value = value
+                continue
+
+            # A new key. Resize as put() would, only now that the key is known
+            # to be new, and let _put_hashed() place it in the new table.
+            # Live entries plus tombstones reach this bound before either
+            # resize condition can hold.
+            if self._size + self._tombstones >= capacity * self._max_load_factor:
+                new_capacity = self._capacity_for_put()
+                if new_capacity:
+                    self.resize_table(new_capacity)
+                    self._put_hashed(key, value, hash)
+                    buckets = None
+                    continue
+
+            # The new entry reuses a tombstone if the probe passed one;
+            # _put_hashed() grows the table if there is no free bucket.
+            if tombstone_index != -1:
+                index = tombstone_index
+                self._tombstones -= 1
+            elif index == -1:
+                self._put_hashed(key, value, hash)
+                buckets = None
+                continue
+            buckets[index] = HashEntry(key, value, hash)
+            self._size += 1
+            self._modifications += 1
+
+    def _find_each(self, keys: list):
+        """
+        Hash the keys in one batch, then yield for each key in turn what
+        _find() would return, with the probe loop inlined. Each key is looked
+        up only when the previous index has been consumed, so the caller may
+        remove that entry first. The table must not be resized meanwhile.
+        """
+        buckets = self._buckets.raw()
+        capacity = self._capacity
+
+        # The steps between probes: j for triangular offsets, 2j - 1 for
+        # squares, one fewer than the probes since the home bucket comes
+        # first. With a power-of-two capacity, % capacity equals & mask.
+        if self._power_of_two:
+            steps = range(1, capacity)
+        else:
+            steps = range(1, 2 * capacity - 2, 2)
+
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            # The home bucket is checked before the loop, as in _probe().
+            index = hash % capacity
+            hash_entry = buckets[index]
+            if hash_entry is None:
+                yield -1
+                continue
+            if hash_entry.hash == hash and hash_entry.key == key and not hash_entry.is_tombstone:
+                yield index
+                continue
+
+            found = -1
+            for step in steps:
+                index = (index + step) % capacity
+                hash_entry = buckets[index]
+                if hash_entry is None:
+                    break
+                if hash_entry.hash == hash and hash_entry.key == key and \
+                        not hash_entry.is_tombstone:
+                    found = index
+                    break
+            yield found
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a DynamicArray with the value of each given key, in order,
+        or None for keys that are not in the hash map.
+
+        Parameters:
+            keys: iterable of str
+
+        Returns:
+            DynamicArray
+        """
+        keys = list(keys)
+        self._finish_migration()
+        buckets = self._buckets.raw()
+        return DynamicArray([None if index == -1 else buckets[index].value
+                             for index in self._find_each(keys)])
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map, ignoring keys that are not present.
+
+        Parameters:
+            keys: iterable of str
+
+        Returns:
+            None
+        """
+        keys = list(keys)
+        self._finish_migration()
+        buckets = self._buckets.raw()
+        removed = 0
+        for index in self._find_each(keys):
+            if index != -1:
+                buckets[index].is_tombstone = True
+                removed += 1
+
+        # The counters are only read by other methods, so _remove_at()'s
+        # updates are made once for the whole batch.
+        self._size -= removed
+        self._tombstones += removed
+        self._modifications += removed
 
     def get_keys(self) -> DynamicArray:
         """
@@ -326,15 +852,63 @@ class HashMap:
             DynamicArray - contains all the keys stored in the hash map.
         """
         array_of_keys = DynamicArray()
+        self._finish_migration()
 
-        # Iterates through each linked_list.
-        for i in range(0, self._capacity):
-            hash_entry = self._buckets[i]
+        # Iterates through each bucket.
+        for hash_entry in self._buckets.raw():
             if hash_entry and not hash_entry.is_tombstone:
                 array_of_keys.append(hash_entry.key)
 
         return array_of_keys
 
+    def save(self, path: str) -> None:
+        """
+        Writes a snapshot of the hash table to path. The snapshot can be
+        reopened read-only, without rebuilding the table, with
+        hash_map_mmap.MappedHashMap(path).
+
+        Parameters:
+            path: str
+
+        Returns:
+            None
+        """
+        self._finish_migration()
+        hash_map_mmap.save(self, path)
+
+    def _entries(self):
+        """
+        Yield every live HashEntry in the hash map, in bucket order, without
+        copying. Raises RuntimeError if the map gains or loses keys, or is
+        resized, while the iteration is in progress.
+        """
+        self._finish_migration()
+        modifications = self._modifications
+        for hash_entry in self._buckets.raw():
+            if hash_entry and not hash_entry.is_tombstone:
+                yield hash_entry
+                if self._modifications != modifications:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def __iter__(self):
+        """Return an iterator over the keys in the hash map."""
+        return self.keys()
+
+    def keys(self):
+        """Return a lazy iterator over the keys in the hash map."""
+        for hash_entry in self._entries():
+            yield hash_entry.key
+
+    def values(self):
+        """Return a lazy iterator over the values in the hash map."""
+        for hash_entry in self._entries():
+            yield hash_entry.value
+
+    def items(self):
+        """Return a lazy iterator over the (key, value) pairs in the hash map."""
+        for hash_entry in self._entries():
+            yield hash_entry.key, hash_entry.value
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -525,3 +1099,52 @@ if __name__ == "__main__":
     m.remove('100')
     m.resize_table(2)
     print(m.get_keys())
+
+    print("\ntombstone_ratio example 1")
+    print("--------------------------")
+    m = HashMap(64, hash_function_2, power_of_two=True)
+    for i in range(30):
+        m.put(str(i), i)
+    for i in range(1000):
+        m.remove(str(i))
+        m.put(str(i + 30), i)
+        if i % 200 == 199:
+            print(round(m.tombstone_ratio(), 2), m.get_size(), m.get_capacity())
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 150, 10):
+        m.put(str(i), i * 10)
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items()))
+    try:
+        for key in m:
+            m.remove(key)
+    except RuntimeError as error:
+        print("RuntimeError:", error)
+
+    print("\nprobe_report example 1")
+    print("-----------------------")
+    m = HashMap(64, hash_function_1, instrument=True)
+    for i in range(200):
+        m.put('key' + str(i), i)
+    for i in range(400):
+        m.get('key' + str(i))
+    report = m.probe_report()
+    print(report['put'], report['get'], report['resizes'])
+
+    print("\nfrom_iterable example 1")
+    print("-----------------------")
+    lines = ('word' + str(i % 700) for i in range(2000))
+    m = HashMap.from_iterable(((line, len(line)) for line in lines), hash_function_2,
+                              size_hint=700, chunk_size=256)
+    print(m.get_size(), m.get_capacity(), m.get('word42'))
+
+    print("\nincremental_resize example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_2, incremental_resize=True)
+    for i in range(100):
+        m.put('key' + str(i), i)
+        if i % 25 == 24:
+            print(m.get_size(), m.get_capacity(),
+                  all(m.get('key' + str(j)) == j for j in range(i + 1)))
@@ -0,0 +1,215 @@
+# Description: A Robin Hood variant of the Open Addressing HashMap. Entries are
+# placed with linear probing over a power-of-two table; on insert, an entry that
+# has probed further from its home bucket takes the slot of one that has probed
+# less, which keeps probe lengths short and even. Removal shifts the following
+# entries back instead of leaving tombstones, so the table can run at a much
+# higher load factor than the quadratic probing map.
+# The probing helpers of hash_map_oa.HashMap are overridden, so put(), get(),
+# remove() and contains_key() (and their instrumentation) are inherited.
+
+import hash_map_oa
+from a6_include import HashEntry, hash_many, hash_function_1, hash_function_2
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function, max_load_factor: float = 0.85,
+                 instrument: bool = False) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood linear probing for collision resolution.
+        """
+        super().__init__(capacity, function, power_of_two=True,
+                         max_load_factor=max_load_factor, compaction_threshold=1,
+                         instrument=instrument)
+
+    def _probe_index(self, hash: int, j: int) -> int:
+        """
+        Return the bucket index of the j-th probe for the given hash
+        (j = 0 is the home bucket).
+        """
+        return (hash + j) & self._mask
+
+    def _probe_mode(self) -> str:
+        """Name of the probe sequence, as recorded in snapshots by save()."""
+        return 'linear'
+
+    def _probe(self, key: object, hash: int) -> (int, HashEntry, int):
+        """
+        Returns (index, entry, probes) if the entry for key is at index,
+        otherwise (-1, None, probes); probes is the number of buckets read.
+        The search stops early once it reaches an entry that is closer to its
+        home bucket than the key would be, since the key would have displaced it.
+        """
+        buckets = self._buckets.raw()
+        mask = self._mask
+        index = hash & mask
+        distance = 0
+        hash_entry = buckets[index]
+        while hash_entry:
+            # (index - hash) & mask is how far an entry sits past its home bucket.
+            if (index - hash_entry.hash) & mask < distance:
+                return -1, None, distance + 1
+            if hash_entry.hash == hash and hash_entry.key == key:
+                return index, hash_entry, distance + 1
+            index = (index + 1) & mask
+            distance += 1
+            hash_entry = buckets[index]
+        return -1, None, distance + 1
+
+    def _find_each(self, keys: list):
+        """
+        Hash the keys in one batch, then yield for each key in turn what
+        _find() would return, with the Robin Hood probe loop inlined. Each
+        key is looked up only when the previous index has been consumed.
+        """
+        buckets = self._buckets.raw()
+        mask = self._mask
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            index = hash & mask
+            distance = 0
+            found = -1
+            hash_entry = buckets[index]
+            while hash_entry:
+                if (index - hash_entry.hash) & mask < distance:
+                    break
+                if hash_entry.hash == hash and hash_entry.key == key:
+                    found = index
+                    break
+                index = (index + 1) & mask
+                distance += 1
+                hash_entry = buckets[index]
+            yield found
+
+    def put_many(self, pairs) -> None:
+        """
+        Puts every (key, value) pair of the iterable into the hash map, as if
+        put() were called for each in order. All keys are hashed in one batch,
+        and the table is only resized for keys that turn out to be new.
+
+        Parameters:
+            pairs: iterable of (key, value)
+
+        Returns:
+            None
+        """
+        # The inherited put_many() inlines the quadratic probe loop, so new
+        # entries are placed by _put_hashed() here instead.
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        keys = [key for key, _ in pairs]
+        self._reserve(len(set(keys)) - self._size)
+        for (key, value), hash in zip(pairs, hash_many(self._hash_function, keys)):
+            if self._size >= self._capacity * self._max_load_factor:
+                new_capacity = self._capacity_for_put()
+                if new_capacity and self._find(key, hash) == -1:
+                    self.resize_table(new_capacity)
+            self._put_hashed(key, value, hash)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map, ignoring keys that are not present.
+
+        Parameters:
+            keys: iterable of str
+
+        Returns:
+            None
+        """
+        # Each removal shifts entries back, so it must happen before the next
+        # key is looked up.
+        for index in self._find_each(list(keys)):
+            if index != -1:
+                self._remove_at(index)
+
+    def _insert_entry(self, hash_entry: HashEntry) -> bool:
+        """
+        Place an entry whose key is known to be absent, swapping it with any
+        entry that sits closer to its home bucket and carrying that entry on.
+        Does not update the size. Linear probing reaches every bucket and the
+        load factor stays below 1, so this always succeeds and returns True.
+        """
+        buckets = self._buckets.raw()
+        mask = self._mask
+        index = hash_entry.hash & mask
+        distance = 0
+        current = buckets[index]
+        while current:
+            current_distance = (index - current.hash) & mask
+            if current_distance < distance:
+                buckets[index] = hash_entry
+                if distance + 1 > self._max_probe_length:
+                    self._max_probe_length = distance + 1
+                hash_entry, distance = current, current_distance
+            index = (index + 1) & mask
+            distance += 1
+            current = buckets[index]
+        buckets[index] = hash_entry
+        if distance + 1 > self._max_probe_length:
+            self._max_probe_length = distance + 1
+        return True
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Put a key/value pair whose hash is already known, without checking
+        the load factor first.
+        """
+        _, hash_entry, probes = self._probe(key, hash)
+        if self._histograms is not None:
+            self._histograms['put'].record(probes)
+        if hash_entry is not None:
+            hash_entry.value = value
+            return
+
+        self._insert_entry(HashEntry(key, value, hash))
+        self._size += 1
+        self._modifications += 1
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Delete the entry at the given bucket index, shifting the entries after
+        it back one bucket until an empty bucket or an entry already in its
+        home bucket is reached.
+        """
+        buckets = self._buckets.raw()
+        mask = self._mask
+        next_index = (index + 1) & mask
+        next_entry = buckets[next_index]
+        while next_entry and (next_index - next_entry.hash) & mask > 0:
+            buckets[index] = next_entry
+            index = next_index
+            next_index = (next_index + 1) & mask
+            next_entry = buckets[next_index]
+
+        buckets[index] = None
+        self._size -= 1
+        self._modifications += 1
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove")
+    print("------------------")
+    m = HashMap(50, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.contains_key('str42'), m.contains_key('str150'))
+    m.remove('str42')
+    print(m.get('str42'), m.contains_key('str42'), m.get_size())
+
+    print("\nchurn at high load leaves no tombstones")
+    print("---------------------------------------")
+    m = HashMap(64, hash_function_2, max_load_factor=0.9)
+    for i in range(50):
+        m.put(str(i), i)
+    for i in range(10000):
+        m.remove(str(i % 50))
+        m.put(str(i % 50), i)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2),
+          m.empty_buckets() + m.get_size() == m.get_capacity())
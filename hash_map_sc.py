@@ -1,37 +1,158 @@
 # Name: Matthew Tinnel
 # Description: An implementation of a HashMap with Chaining for collision resolution.
 # Utilizes a Dynamic Array containing SLNodes of LinkedLists for the underlying
-# storage type.
+# storage type. Empty buckets hold None: a bucket's LinkedList is created by
+# its first insert and dropped again when its last key is removed.
 # The following methods are added by the author:
 #   put()
+#   setdefault()
+#   get_or_insert()
+#   update_with()
 #   empty_buckets()
 #   table_load()
+#   stats()
+#   probe_report()
 #   clear()
 #   resize_table()
 #   get()
 #   contains_key()
 #   remove()
 #   get_keys()
+#   from_iterable()
+#   put_many()
+#   get_many()
+#   remove_many()
+#   keys()
+#   values()
+#   items()
 #   find_mode()
+# Chains longer than the treeify threshold are replaced by a SortedChain, which
+# finds keys by binary search, and go back to a LinkedList once they shrink.
 
+import itertools
+import multiprocessing
+import time
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2, hash_function_3)
+from a6_include import (DynamicArray, LinkedList, ProbeHistogram, SortedChain,
+                        get_hash_function, hash_many, hash_function_1, hash_function_2,
+                        hash_function_3)
+
+# Number of old buckets each operation moves over during an incremental resize.
+_MIGRATE_BUCKETS = 8
+
+# The bucket method used to look keys up under each chain_policy.
+_CHAIN_POLICIES = {
+    None: 'contains',
+    'move_to_front': 'move_to_front',
+    'transpose': 'transpose',
+}
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function,
+                 max_load_factor: float = 1.0,
+                 min_load_factor: float = 0.0,
+                 instrument: bool = False,
+                 incremental_resize: bool = False,
+                 chain_policy: str = None,
+                 treeify_threshold: int = 8) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution.
+        function is a hash function or the name of one in
+        a6_include.HASH_FUNCTIONS, e.g. 'blake2b'. A capacity below 1 is
+        raised to 1.
+
+        The table doubles its capacity when a put() finds the load factor
+        at or above max_load_factor, and halves it (never below the initial
+        capacity) when a remove() drops the load factor below
+        min_load_factor. A max_load_factor of None disables growing and a
+        min_load_factor of 0 disables shrinking.
+
+        If instrument is True, the number of chain nodes each get, put, remove
+        and contains_key call walks is recorded, along with the number and
+        duration of resizes; see probe_report().
+
+        If incremental_resize is True, the resizes triggered by put() and
+        remove() do not rehash everything at once. The old bucket array is
+        kept, and each following get, put, remove and contains_key call moves
+        a few of its buckets into the new one until it is empty.
+
+        chain_policy makes chains self-organizing for skewed access: with
+        'move_to_front' a key found by a lookup moves to the head of its
+        chain, and with 'transpose' it swaps places with the node before it.
+
+        A chain that grows past treeify_threshold nodes is converted into a
+        SortedChain, so a bucket flooded by a weak hash function or by
+        adversarial keys is searched in O(log n); it is converted back once it
+        shrinks to half the threshold. None disables this. A SortedChain has
+        no order to adapt, so chains are never converted when chain_policy is
+        set: the long chains are the ones the policy helps most.
         """
-        self._buckets = DynamicArray()
-        for _ in range(capacity):
-            self._buckets.append(LinkedList())
+        if max_load_factor is not None and max_load_factor <= 0:
+            raise ValueError("max_load_factor must be positive")
+        if min_load_factor < 0 or (max_load_factor is not None and
+                                   min_load_factor >= max_load_factor / 2):
+            raise ValueError("min_load_factor must be in [0, max_load_factor / 2)")
+        if chain_policy not in _CHAIN_POLICIES:
+            raise ValueError("chain_policy must be None, 'move_to_front' or 'transpose'")
+        if treeify_threshold is not None and treeify_threshold < 1:
+            raise ValueError("treeify_threshold must be at least 1")
+
+        capacity = max(1, capacity)
+        self._buckets = self._new_buckets(capacity)
 
         self._capacity = capacity
-        self._hash_function = function
+        self._initial_capacity = capacity
+        self._hash_function = get_hash_function(function)
         self._size = 0
+        self._modifications = 0
+
+        # Maintained on every insert and removal so empty_buckets() and
+        # stats() don't have to scan the table. _old_occupied_buckets counts
+        # the old table of an incremental resize, _occupied_buckets the new one.
+        self._occupied_buckets = 0
+        self._old_occupied_buckets = 0
+        self._max_chain_length = 0
+
+        self._max_load_factor = max_load_factor
+        self._min_load_factor = min_load_factor
+
+        # During an incremental resize, the old bucket list and the index of
+        # its first bucket not yet moved. A key whose old bucket has not been
+        # moved yet is still in the old table.
+        self._incremental_resize = incremental_resize
+        self._old_buckets = None
+        self._migrate_index = 0
+
+        # Chain lookup function per bucket type, called as
+        # self._finders[type(linked_list)](linked_list, key, hash).
+        self._chain_policy = chain_policy
+        self._finders = {bucket_type: getattr(bucket_type, _CHAIN_POLICIES[chain_policy])
+                         for bucket_type in (LinkedList, SortedChain)}
+
+        # A LinkedList reaching _treeify_length nodes becomes a SortedChain,
+        # and a SortedChain dropping to _untreeify_length nodes becomes a
+        # LinkedList again. Lengths only change by one, so equality suffices;
+        # a bucket never holds 0 nodes, so 0 disables either conversion.
+        if chain_policy is not None:
+            treeify_threshold = None
+        self._treeify_length = treeify_threshold + 1 if treeify_threshold else 0
+        self._untreeify_length = treeify_threshold // 2 if treeify_threshold else 0
+
+        # Chain-hop histograms per operation, or None when instrumentation is
+        # off so the hot paths only pay for one comparison.
+        self._histograms = None
+        if instrument:
+            self._histograms = {name: ProbeHistogram()
+                                for name in ('get', 'put', 'remove', 'contains_key')}
+        self._resizes = 0
+        self._resize_seconds = 0.0
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """Return a bucket array of capacity empty (None) buckets."""
+        return DynamicArray.filled(capacity)
 
     def __str__(self) -> str:
         """
@@ -39,7 +160,10 @@ class HashMap:
         """
         out = ''
         for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+            linked_list = self._buckets[i]
+            if linked_list is None:
+                linked_list = LinkedList()
+            out += str(i) + ': ' + str(linked_list) + '\n'
         return out
 
     def get_size(self) -> int:
@@ -68,44 +192,185 @@ class HashMap:
         Returns:
             None
         """
+        buckets, index, hash, node = self._lookup_for_insert(key)
 
-        # Get the hashed index of the map
+        # If the value for the key is getting replaced, the node is updated in place.
+        if node:
+            node.value = value
+
+        # Else add a link in the LinkedList for that index.
+        else:
+            self._insert_new(buckets, index, key, value, hash)
+
+    def _lookup_for_insert(self, key: str) -> (list, int, int, object):
+        """
+        Grow the table if the load factor has reached the maximum, then walk
+        key's chain once. Returns (the bucket list and index of the key's
+        chain, the key's hash, the key's node or None if it is absent), ready
+        for an update or an insert.
+        """
+        # If the load factor has reached the maximum,
+        # resize the table before putting the new key/value pair
+        if self._max_load_factor is not None and \
+                self.table_load() >= self._max_load_factor:
+            self._resize(self._capacity * 2)
+
+        # Get the hashed index of the map. The hash is cached on the node
+        # so resize_table() never re-runs the hash function.
         hash = self._hash_function(key)
-        index = hash % self._capacity
-        linked_node = self._buckets[index]
+        if self._old_buckets is None:
+            buckets, index = self._buckets.raw(), hash % self._capacity
+        else:
+            buckets, index = self._migrating_bucket(hash)
+        linked_node = buckets[index]
+        if self._histograms is not None:
+            self._record('put', linked_node, key, hash)
 
-        # If that bucket is empty.
-        if linked_node.length() == 0:
-            linked_node.insert(key, value)
-            self._size += 1
+        if linked_node is None:
+            return buckets, index, hash, None
+        return buckets, index, hash, self._finders[type(linked_node)](linked_node, key, hash)
 
-        # If the value for the key is getting replaced.
-        elif linked_node.contains(key):
-            linked_node.remove(key)
-            linked_node.insert(key, value)
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, it is added with the value default, which is returned.
 
-        # Else add a link in the LinkedList for that index.
-        else:
-            linked_node.insert(key, value)
-            self._size += 1
+        Parameters:
+            key: str
+            default: object
 
-    def empty_buckets(self) -> int:
+        Returns:
+            object
         """
-        Returns the number of empty buckets in the hash table.
+        buckets, index, hash, node = self._lookup_for_insert(key)
+        if node:
+            return node.value
+        self._insert_new(buckets, index, key, default, hash)
+        return default
+
+    def get_or_insert(self, key: str, factory) -> object:
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, factory() is called and its result is added under
+        the key and returned, so the value is only built when it is needed.
 
         Parameters:
+            key: str
+            factory: callable taking no arguments
 
         Returns:
-            int
+            object
+        """
+        buckets, index, hash, node = self._lookup_for_insert(key)
+        if node:
+            return node.value
+        value = factory()
+        self._insert_new(buckets, index, key, value, hash)
+        return value
+
+    def update_with(self, key: str, function, default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by function(value),
+        using function(default) if the key is not in the hash map, with a
+        single lookup. Returns the new value.
+
+        Parameters:
+            key: str
+            function: callable taking the old value
+            default: object
+
+        Returns:
+            object
+        """
+        buckets, index, hash, node = self._lookup_for_insert(key)
+        if node:
+            node.value = function(node.value)
+            return node.value
+        value = function(default)
+        self._insert_new(buckets, index, key, value, hash)
+        return value
+
+    def _insert_new(self, buckets: list, index: int, key: str, value: object,
+                    hash: int) -> None:
+        """
+        Insert a key known to be absent into the list of bucket index of
+        buckets, creating the list if the bucket is empty, and keep the size
+        and table statistics up to date.
         """
+        linked_list = buckets[index]
+        if linked_list is None:
+            linked_list = buckets[index] = LinkedList()
+            if buckets is self._old_buckets:
+                self._old_occupied_buckets += 1
+            else:
+                self._occupied_buckets += 1
+        linked_list.insert(key, value, hash)
+        self._size += 1
+        self._modifications += 1
+        if linked_list.length() > self._max_chain_length:
+            self._max_chain_length = linked_list.length()
+        if linked_list.length() == self._treeify_length and type(linked_list) is LinkedList:
+            buckets[index] = SortedChain(linked_list)
+
+    def _remove_from(self, buckets: list, index: int, key: str, hash: int) -> bool:
+        """
+        Remove key from the list of bucket index of buckets, emptying the
+        bucket if it was the last key, and keep the size and table statistics
+        up to date. Returns True if the key was removed.
+        """
+        linked_list = buckets[index]
+        if linked_list is None or not linked_list.remove(key, hash):
+            return False
+        if linked_list.length() == 0:
+            buckets[index] = None
+            if buckets is self._old_buckets:
+                self._old_occupied_buckets -= 1
+            else:
+                self._occupied_buckets -= 1
+        elif linked_list.length() == self._untreeify_length and type(linked_list) is SortedChain:
+            buckets[index] = self._to_linked_list(linked_list)
+        self._size -= 1
+        self._modifications += 1
+        return True
+
+    @staticmethod
+    def _to_linked_list(sorted_chain: SortedChain) -> LinkedList:
+        """Return a LinkedList holding the keys of a SortedChain, in its order."""
+        linked_list = LinkedList()
+        for node in reversed(list(sorted_chain)):
+            linked_list.insert(node.key, node.value, node.hash)
+        return linked_list
+
+    def _record(self, operation: str, linked_list: LinkedList, key: str, hash: int) -> None:
+        """
+        Record in the operation's histogram how many nodes a search for key
+        walks in linked_list (None for an empty bucket): its position, or the
+        whole chain if it is absent. Only called in instrumentation mode.
+        """
+        if type(linked_list) is SortedChain:
+            # A binary search reads about log2(length) + 1 entries.
+            self._histograms[operation].record(linked_list.length().bit_length())
+            return
 
-        num_empty_buckets = 0
+        hops = 0
+        for node in linked_list if linked_list is not None else ():
+            hops += 1
+            if node.hash == hash and node.key == key:
+                break
+        self._histograms[operation].record(hops)
 
-        for i in range(0, self._capacity):
-            if self._buckets[i].length() == 0:
-                num_empty_buckets += 1
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table. During an
+        incremental resize this is the new table's count, so keys not moved
+        over yet don't fill any bucket; the resize is not completed first.
 
-        return num_empty_buckets
+        Parameters:
+
+        Returns:
+            int
+        """
+        return self._capacity - self._occupied_buckets
 
     def table_load(self) -> float:
         """
@@ -118,6 +383,45 @@ class HashMap:
         """
         return self._size / self._capacity
 
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the table's statistics, in constant time:
+        size, capacity, load, empty_buckets, and max_chain_length, the longest
+        chain seen since the last resize or clear.
+
+        Parameters:
+
+        Returns:
+            dict
+        """
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': self.empty_buckets(),
+            'max_chain_length': self._max_chain_length,
+        }
+
+    def probe_report(self) -> dict:
+        """
+        Returns the instrumentation data: for each of get, put, remove and
+        contains_key, the number of calls and the p50, p99 and max number of
+        chain nodes walked, plus the number of resizes and their total time
+        in seconds. Returns None if the map was created without instrument=True.
+
+        Parameters:
+
+        Returns:
+            dict
+        """
+        if self._histograms is None:
+            return None
+
+        report = {name: histogram.summary() for name, histogram in self._histograms.items()}
+        report['resizes'] = self._resizes
+        report['resize_seconds'] = self._resize_seconds
+        return report
+
     def clear(self) -> None:
         """
         Clears the contents of the hash map. It does not change the underlying
@@ -128,12 +432,13 @@ class HashMap:
         Returns:
             None
         """
-        new_buckets = DynamicArray()
-        for i in range(0, self._capacity):
-            new_buckets.append(LinkedList())
-
         self._size = 0
-        self._buckets = new_buckets
+        self._modifications += 1
+        self._occupied_buckets = 0
+        self._old_occupied_buckets = 0
+        self._max_chain_length = 0
+        self._old_buckets = None
+        self._buckets = self._new_buckets(self._capacity)
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -152,25 +457,111 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        # Copy current bucket to temp_bucket array to save data.
-        temp_buckets = DynamicArray()
-        for i in range(0, self._capacity):
-            temp_buckets.append(self._buckets[i])
+        self._finish_migration()
+        if self._histograms is not None:
+            start = time.perf_counter()
+
+        # Keep the old buckets to rehash from and switch to the new ones.
+        self._modifications += 1
+        old_buckets = self._buckets.raw()
+        self._capacity = new_capacity
+        self._buckets = self._new_buckets(new_capacity)
+        new_buckets = self._buckets.raw()
+
+        # Rehash straight into the new buckets using each node's cached hash;
+        # keys are already unique, so put()'s lookup and load check are not needed.
+        occupied_buckets = 0
+        max_chain_length = 0
+        treeify_length = self._treeify_length
+        for linked_list in old_buckets:
+            if linked_list is None:
+                continue
+            for node in linked_list:
+                index = node.hash % new_capacity
+                new_list = new_buckets[index]
+                if new_list is None:
+                    new_list = new_buckets[index] = LinkedList()
+                    occupied_buckets += 1
+                new_list.insert(node.key, node.value, node.hash)
+                if new_list.length() > max_chain_length:
+                    max_chain_length = new_list.length()
+                if new_list.length() == treeify_length and type(new_list) is LinkedList:
+                    new_buckets[index] = SortedChain(new_list)
+
+        self._occupied_buckets = occupied_buckets
+        self._max_chain_length = max_chain_length
+
+        if self._histograms is not None:
+            self._resizes += 1
+            self._resize_seconds += time.perf_counter() - start
+
+    def _resize(self, new_capacity: int) -> None:
+        """Resize the table, incrementally if the map was created that way."""
+        if not self._incremental_resize:
+            self.resize_table(new_capacity)
+            return
 
-        new_buckets = DynamicArray()
-        for i in range(0, new_capacity):
-            new_buckets.append(LinkedList())
+        self._finish_migration()
+        if self._histograms is not None:
+            self._resizes += 1
 
-        # Save old capacity and update to new capacity and buckets.
-        old_capacity = self._capacity
+        # Switch to the new buckets; the old ones are emptied by _migrate().
+        self._modifications += 1
+        self._old_occupied_buckets = self._occupied_buckets
+        self._occupied_buckets = 0
+        self._old_buckets = self._buckets.raw()
+        self._migrate_index = 0
         self._capacity = new_capacity
-        self._buckets = new_buckets
-        self._size = 0
+        self._buckets = self._new_buckets(new_capacity)
 
-        for i in range(0, old_capacity):
-            linked_list = temp_buckets[i]
+    def _migrate(self, count: int) -> None:
+        """
+        Move the next count buckets of the old table into the new one,
+        dropping the old table once every bucket has been moved.
+        """
+        old_buckets = self._old_buckets
+        new_buckets = self._buckets.raw()
+        capacity = self._capacity
+        end = min(self._migrate_index + count, len(old_buckets))
+        for index in range(self._migrate_index, end):
+            linked_list = old_buckets[index]
+            if linked_list is None:
+                continue
+            self._old_occupied_buckets -= 1
             for node in linked_list:
-                self.put(node.key, node.value)
+                new_index = node.hash % capacity
+                new_list = new_buckets[new_index]
+                if new_list is None:
+                    new_list = new_buckets[new_index] = LinkedList()
+                    self._occupied_buckets += 1
+                new_list.insert(node.key, node.value, node.hash)
+                if new_list.length() > self._max_chain_length:
+                    self._max_chain_length = new_list.length()
+                if new_list.length() == self._treeify_length and type(new_list) is LinkedList:
+                    new_buckets[new_index] = SortedChain(new_list)
+            old_buckets[index] = None
+
+        self._migrate_index = end
+        if end == len(old_buckets):
+            self._old_buckets = None
+
+    def _finish_migration(self) -> None:
+        """Complete any incremental resize in progress."""
+        if self._old_buckets is not None:
+            self._migrate(len(self._old_buckets))
+
+    def _migrating_bucket(self, hash: int) -> (list, int):
+        """
+        Move the next few old buckets during an incremental resize, then
+        return (bucket list, index) of the bucket that holds, or should
+        receive, a key with this hash.
+        """
+        self._migrate(_MIGRATE_BUCKETS)
+        if self._old_buckets is not None:
+            old_index = hash % len(self._old_buckets)
+            if old_index >= self._migrate_index:
+                return self._old_buckets, old_index
+        return self._buckets.raw(), hash % self._capacity
 
     def get(self, key: str) -> object:
         """
@@ -186,10 +577,19 @@ class HashMap:
 
         # Get the hashed index of the map
         hash = self._hash_function(key)
-        index = hash % self._capacity
-        linked_node = self._buckets[index]
+        if self._old_buckets is None:
+            linked_node = self._buckets.raw()[hash % self._capacity]
+        else:
+            buckets, index = self._migrating_bucket(hash)
+            linked_node = buckets[index]
+        if self._histograms is not None:
+            self._record('get', linked_node, key, hash)
+
+        # An empty bucket holds None rather than an empty list.
+        if linked_node is None:
+            return None
 
-        found_node = linked_node.contains(key)
+        found_node = self._finders[type(linked_node)](linked_node, key, hash)
         if found_node:
             if found_node.key == key:
                 return found_node.value
@@ -207,14 +607,25 @@ class HashMap:
         """
 
         if self._size == 0:
+            if self._histograms is not None:
+                self._histograms['contains_key'].record(0)
             return False
 
         # Get the hashed index of the map
         hash = self._hash_function(key)
-        index = hash % self._capacity
-        linked_node = self._buckets[index]
+        if self._old_buckets is None:
+            linked_node = self._buckets.raw()[hash % self._capacity]
+        else:
+            buckets, index = self._migrating_bucket(hash)
+            linked_node = buckets[index]
+        if self._histograms is not None:
+            self._record('contains_key', linked_node, key, hash)
+
+        # An empty bucket holds None rather than an empty list.
+        if linked_node is None:
+            return False
 
-        found_node = linked_node.contains(key)
+        found_node = self._finders[type(linked_node)](linked_node, key, hash)
         if found_node:
             if found_node.key == key:
                 return True
@@ -235,16 +646,162 @@ class HashMap:
 
         # Get the hashed index of the map
         hash = self._hash_function(key)
-        index = hash % self._capacity
-        linked_node = self._buckets[index]
+        if self._old_buckets is None:
+            buckets, index = self._buckets.raw(), hash % self._capacity
+        else:
+            buckets, index = self._migrating_bucket(hash)
+        if self._histograms is not None:
+            self._record('remove', buckets[index], key, hash)
 
-        remove_node = linked_node.remove(key)
+        remove_node = self._remove_from(buckets, index, key, hash)
         if remove_node:
-            self._size -= 1
+            # Shrink the table if it has become too sparse.
+            if self.table_load() < self._min_load_factor and \
+                    self._capacity // 2 >= self._initial_capacity:
+                self._resize(self._capacity // 2)
 
         # If the key is not in the hash map.
         return
 
+    @classmethod
+    def from_iterable(cls, iterable, function, size_hint: int = None,
+                      chunk_size: int = 4096, **options) -> "HashMap":
+        """
+        Builds a hash map from an iterable of (key, value) pairs, such as a
+        generator over a large file. The input is consumed chunk_size pairs at
+        a time through put_many(), so no more than one chunk of it is held in
+        memory. If size_hint (the expected number of distinct keys) is given,
+        the table is sized for it up front; after that, each chunk only grows
+        the table for keys that are new, so repeated keys take no extra room.
+        options are passed to the constructor.
+
+        Parameters:
+            iterable: iterable of (key, value)
+            function: hash function or its name
+            size_hint: int
+            chunk_size: int
+
+        Returns:
+            HashMap
+        """
+        hash_map = cls(11, function, **options)
+        if size_hint:
+            hash_map._reserve(size_hint)
+
+        iterator = iter(iterable)
+        chunk = list(itertools.islice(iterator, chunk_size))
+        while chunk:
+            hash_map.put_many(chunk)
+            chunk = list(itertools.islice(iterator, chunk_size))
+        return hash_map
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grow the table, with a single resize, so that count more new entries
+        fit without the load factor passing the maximum.
+        """
+        if self._max_load_factor is None:
+            return
+        new_capacity = self._capacity
+        while (self._size + count) / new_capacity > self._max_load_factor:
+            new_capacity *= 2
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
+    def put_many(self, pairs) -> None:
+        """
+        Puts every (key, value) pair of the iterable into the hash map, as if
+        put() were called for each in order. All keys are hashed in one batch,
+        and the table only grows for keys that turn out to be new.
+
+        Parameters:
+            pairs: iterable of (key, value)
+
+        Returns:
+            None
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        self._finish_migration()
+        keys = [key for key, _ in pairs]
+        # However many existing keys the batch repeats, at least this many of
+        # its keys are new, so the table is grown for them in one resize.
+        self._reserve(len(set(keys)) - self._size)
+        hashes = hash_many(self._hash_function, keys)
+        capacity = self._capacity
+        buckets = self._buckets.raw()
+        finders = self._finders
+        max_load_factor = self._max_load_factor
+        for (key, value), hash in zip(pairs, hashes):
+            index = hash % capacity
+            linked_list = buckets[index]
+            node = finders[type(linked_list)](linked_list, key, hash) if linked_list else None
+            if node:
+                node.value = value
+                continue
+
+            # Grow as put() would, but only once the key is known to be new.
+            if max_load_factor is not None and self._size >= capacity * max_load_factor:
+                self.resize_table(capacity * 2)
+                capacity = self._capacity
+                buckets = self._buckets.raw()
+                index = hash % capacity
+            self._insert_new(buckets, index, key, value, hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a DynamicArray with the value of each given key, in order,
+        or None for keys that are not in the hash map.
+
+        Parameters:
+            keys: iterable of str
+
+        Returns:
+            DynamicArray
+        """
+        keys = list(keys)
+        self._finish_migration()
+        capacity = self._capacity
+        buckets = self._buckets.raw()
+        finders = self._finders
+        # Collected in a list, which the DynamicArray copies once, rather than
+        # appended one call at a time.
+        values = []
+        append = values.append
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            linked_list = buckets[hash % capacity]
+            node = finders[type(linked_list)](linked_list, key, hash) if linked_list else None
+            append(node.value if node else None)
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map, ignoring keys that are not
+        present. The table is shrunk at most once, after all removals.
+
+        Parameters:
+            keys: iterable of str
+
+        Returns:
+            None
+        """
+        keys = list(keys)
+        self._finish_migration()
+        capacity = self._capacity
+        buckets = self._buckets.raw()
+        for key, hash in zip(keys, hash_many(self._hash_function, keys)):
+            self._remove_from(buckets, hash % capacity, key, hash)
+
+        # Shrink the table if it has become too sparse.
+        new_capacity = self._capacity
+        while self._size / new_capacity < self._min_load_factor and \
+                new_capacity // 2 >= self._initial_capacity:
+            new_capacity //= 2
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
     def get_keys(self) -> DynamicArray:
         """
         Parameters:
@@ -253,26 +810,73 @@ class HashMap:
             DynamicArray - contains all the keys stored in the hash map.
         """
         array_of_keys = DynamicArray()
+        self._finish_migration()
 
-        # Iterates through each linked_list.
-        for i in range(0, self._capacity):
-            linked_list = self._buckets[i]
+        # Iterates through each linked_list, skipping empty buckets.
+        for linked_list in self._buckets.raw():
+            if linked_list is None:
+                continue
             for node in linked_list:
                 array_of_keys.append(node.key)
 
         return array_of_keys
 
-
-def find_mode(da: DynamicArray) -> (DynamicArray, int):
+    def _nodes(self):
+        """
+        Yield every node in the hash map, bucket by bucket, without copying
+        the table (with a chain_policy, each chain is copied as it is reached).
+        Raises RuntimeError if the map gains or loses keys, or is resized,
+        while the iteration is in progress.
+        """
+        self._finish_migration()
+        modifications = self._modifications
+        for linked_list in self._buckets.raw():
+            if linked_list is None:
+                continue
+            # With a chain policy, lookups made while a chain is being
+            # yielded can reorder it, so each chain is copied first.
+            for node in linked_list if self._chain_policy is None else list(linked_list):
+                yield node
+                if self._modifications != modifications:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def __iter__(self):
+        """Return an iterator over the keys in the hash map."""
+        return self.keys()
+
+    def keys(self):
+        """Return a lazy iterator over the keys in the hash map."""
+        for node in self._nodes():
+            yield node.key
+
+    def values(self):
+        """Return a lazy iterator over the values in the hash map."""
+        for node in self._nodes():
+            yield node.value
+
+    def items(self):
+        """Return a lazy iterator over the (key, value) pairs in the hash map."""
+        for node in self._nodes():
+            yield node.key, node.value
+
+
+def find_mode(da: DynamicArray, processes: int = 1) -> (DynamicArray, int):
     """
     Finds the mode(s) of the passed DynamicArray.
+    If processes is greater than 1, the array is counted in shards by a pool
+    of that many worker processes and the partial counts are merged; the
+    result is the same as for a single process.
 
     Parameters:
         da: DynamicArray
+        processes: int
 
     Returns:
         (DynamicArray, int)
     """
+    if processes > 1 and da.length() > 1:
+        return _find_mode_parallel(da, processes)
+
     # if you'd like to use a hash map,
     # use this instance of your Separate Chaining HashMap
     map = HashMap(da.length() // 3, hash_function_1)
@@ -281,24 +885,12 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
 
     mode_array = DynamicArray()
 
-    potential_count = 0
     highest_count = 0
 
-    # iterates through the input array.
+    # iterates through the input array, counting each value with one lookup.
     for i in range(0, da.length()):
         current_val = da[i]
-
-        # If i is already mapped.
-        already_mapped = map.contains_key(current_val)
-        if already_mapped:
-            nodes_value = map.get(da[i])
-            nodes_value += 1
-            potential_count = nodes_value
-            map.put(da[i], nodes_value)
-        # Else it maps it.
-        else:
-            map.put(da[i], 1)
-            potential_count += 1
+        potential_count = map.update_with(current_val, lambda count: count + 1, 0)
 
         # If a new mode is found.
         if potential_count > highest_count:
@@ -314,26 +906,72 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
             mode_array.append(current_val)
             result_tuple = (mode_array, highest_count)
 
-        potential_count = 0
-
     return result_tuple
 
 
-# ------------------- BASIC TESTING ---------------------------------------- #
+def _count_shard(shard: tuple) -> list:
+    """
+    Count the values of one shard, given as (values, offset of its first value
+    in the whole array). Returns a list of (value, (count, index of the last
+    occurrence in the whole array)). Runs in a worker process.
+    """
+    values, offset = shard
+    map = HashMap(max(1, len(values) // 3), hash_function_1)
+    for index, value in enumerate(values, offset):
+        map.update_with(value, lambda counted: (counted[0] + 1, index), (0, None))
+    return list(map.items())
+
 
-my_hash = HashMap(7, hash_function_3)
-my_hash.put(55, 1)
-my_hash.put(5, 2)
-my_hash.put(42, 3)
-my_hash.put(19, 4)
-my_hash.put(25, 5)
-my_hash.put(15, 6)
-my_hash.put(32, 7)
-print(my_hash)
-print(my_hash.table_load())
+def _find_mode_parallel(da: DynamicArray, processes: int) -> (DynamicArray, int):
+    """
+    find_mode() over a pool of worker processes. Each worker counts a
+    contiguous shard; the shard counts are merged in array order.
+    """
+    values = da.raw()
+    shard_size = -(-len(values) // (processes * 4))
+
+    # Shards are sliced lazily as the pool hands them out, so only the ones
+    # in flight are copied, and each shard's counts are merged as they come
+    # back. imap() returns them in array order; later shards hold later
+    # occurrences, so their last index wins.
+    shards = ((values[start:start + shard_size], start)
+              for start in range(0, len(values), shard_size))
+    map = None
+    with multiprocessing.Pool(processes) as pool:
+        for counts in pool.imap(_count_shard, shards):
+            if map is None:
+                map = HashMap(len(counts) or 1, hash_function_1)
+            for value, (count, last_index) in counts:
+                map.update_with(value, lambda counted: (counted[0] + count, last_index),
+                                (0, None))
+
+    # The sequential scan lists the modes in the order they reach the highest
+    # count, which for a mode is its last occurrence.
+    highest_count = max(count for count, _ in map.values())
+    modes = sorted((last_index, value) for value, (count, last_index) in map.items()
+                   if count == highest_count)
+
+    mode_array = DynamicArray()
+    for _, value in modes:
+        mode_array.append(value)
+    return mode_array, highest_count
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
 
+    my_hash = HashMap(7, hash_function_3)
+    my_hash.put(55, 1)
+    my_hash.put(5, 2)
+    my_hash.put(42, 3)
+    my_hash.put(19, 4)
+    my_hash.put(25, 5)
+    my_hash.put(15, 6)
+    my_hash.put(32, 7)
+    print(my_hash)
+    print(my_hash.table_load())
+
     print("\nPDF - put example 1")
     print("-------------------")
     m = HashMap(50, hash_function_1)
@@ -535,3 +1173,73 @@ if __name__ == "__main__":
         map = HashMap(da.length() // 3, hash_function_2)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode: {mode}, Frequency: {frequency}\n")
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 150, 10):
+        m.put(str(i), i * 10)
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items()))
+    try:
+        for key in m:
+            m.remove(key)
+    except RuntimeError as error:
+        print("RuntimeError:", error)
+
+    print("\nprobe_report example 1")
+    print("-----------------------")
+    m = HashMap(16, hash_function_1, instrument=True)
+    for i in range(200):
+        m.put('key' + str(i), i)
+    for i in range(400):
+        m.get('key' + str(i))
+    report = m.probe_report()
+    print(report['put'], report['get'], report['resizes'])
+
+    print("\nfrom_iterable example 1")
+    print("-----------------------")
+    lines = ('word' + str(i % 700) for i in range(2000))
+    m = HashMap.from_iterable(((line, len(line)) for line in lines), hash_function_2,
+                              size_hint=700, chunk_size=256)
+    print(m.get_size(), m.get_capacity(), m.get('word42'))
+
+    print("\nincremental_resize example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_2, incremental_resize=True)
+    for i in range(100):
+        m.put('key' + str(i), i)
+        if i % 25 == 24:
+            print(m.get_size(), m.get_capacity(),
+                  all(m.get('key' + str(j)) == j for j in range(i + 1)))
+
+    print("\ntreeify example 1")
+    print("-----------------")
+    # hash_function_1 gives every permutation of a word the same hash.
+    words = [''.join(letters) for letters in itertools.permutations('abcdef')]
+    for threshold in (None, 8):
+        m = HashMap(11, hash_function_1, instrument=True, treeify_threshold=threshold)
+        for word in words:
+            m.put(word, len(word))
+        found = all(m.get(word) == 6 for word in words)
+        print(threshold, m.get_size(), found, m.probe_report()['get'])
+
+    print("\ntreeify example 2")
+    print("-----------------")
+    # frozenset's < is a subset test, so a treeified chain of frozensets is
+    # kept in hash order only rather than bisected on the keys.
+    sets = [frozenset(letters) for n in (2, 3) for letters in itertools.combinations('abcdef', n)]
+    m = HashMap(1, lambda key: 7, max_load_factor=None)
+    last = {}
+    for i in range(300):
+        m.put(sets[i % len(sets)], i)
+        last[sets[i % len(sets)]] = i
+    print(m.get_size(), all(m.get(key) == i for key, i in last.items()))
+
+    print("\nfind_mode example 3 (process pool)")
+    print("----------------------------------")
+    da = DynamicArray(["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint",
+                       "Ubuntu", "Ubuntu", "Ubuntu", "Ubuntu"] * 100)
+    mode, frequency = find_mode(da, processes=2)
+    print(f"Mode: {mode}, Frequency: {frequency}")
+    mode, frequency = find_mode(da)
+    print(f"Mode: {mode}, Frequency: {frequency}")
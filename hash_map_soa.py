@@ -0,0 +1,315 @@
+# Description: An implementation of a HashMap with Open Addressing for collision
+# resolution that stores its table as a struct of arrays instead of HashEntry
+# objects: hashes live in an array('q'), keys and values in parallel lists and
+# each slot has a state byte (empty / live / tombstone). Capacities are powers of
+# two and probing uses triangular-number steps over a bitmask.
+# The following methods are included:
+#   put()
+#   get()
+#   remove()
+#   contains_key()
+#   clear()
+#   empty_buckets()
+#   resize_table()
+#   table_load()
+#   get_keys()
+
+from array import array
+
+from a6_include import DynamicArray, get_hash_function, hash_function_1, hash_function_2
+
+# Slot states stored in HashMap._states.
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+
+def _next_power_of_two(n: int) -> int:
+    """Return the smallest power of two that is greater than or equal to n."""
+    return 1 << max(0, n - 1).bit_length()
+
+
+def _to_int64(hash: int) -> int:
+    """Wrap an arbitrary Python int hash into the signed 64-bit range of array('q')."""
+    hash &= 0xFFFFFFFFFFFFFFFF
+    return hash - (1 << 64) if hash >= (1 << 63) else hash
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new struct-of-arrays HashMap that uses
+        triangular probing for collision resolution.
+        function is a hash function or the name of one in
+        a6_include.HASH_FUNCTIONS.
+        """
+        capacity = _next_power_of_two(capacity)
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output.
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) + ' V: ' + str(self._values[i]) +
+                        ' TS: ' + str(self._states[i] == TOMBSTONE) + '\n')
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map.
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map.
+        """
+        return self._capacity
+
+    def _find(self, key: object, hash: int) -> int:
+        """
+        Return the slot holding the live entry for key, or -1 if it is absent.
+        """
+        states, hashes, keys, mask = self._states, self._hashes, self._keys, self._mask
+        index = hash & mask
+        for j in range(1, self._capacity + 1):
+            state = states[index]
+            if state == EMPTY:
+                return -1
+            if state == LIVE and hashes[index] == hash and keys[index] == key:
+                return index
+            index = (index + j) & mask
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the given key
+        already exists in the hash map, its associated value must be replaced
+        with the new value. If the given key is not in the hash map, a key/value
+        pair is added.
+
+        The table is resized to double its current capacity when this method is called
+        and the current load factor of the table is greater than or equal to 0.5
+
+        Parameters:
+            key: str
+            value: object
+
+        Returns:
+            None
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(self._capacity * 2)
+
+        hash = _to_int64(self._hash_function(key))
+        states, hashes, keys, mask = self._states, self._hashes, self._keys, self._mask
+
+        # Probe until an empty slot or the live key is found, remembering the
+        # first tombstone passed so it can be reused.
+        tombstone_index = -1
+        index = hash & mask
+        for j in range(1, self._capacity + 1):
+            state = states[index]
+            if state == EMPTY:
+                break
+            if state == TOMBSTONE:
+                if tombstone_index == -1:
+                    tombstone_index = index
+            elif hashes[index] == hash and keys[index] == key:
+                self._values[index] = value
+                return
+            index = (index + j) & mask
+
+        if tombstone_index != -1:
+            index = tombstone_index
+        states[index] = LIVE
+        hashes[index] = hash
+        keys[index] = key
+        self._values[index] = value
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        This method returns the current hash table load factor.
+
+        Parameters:
+
+        Returns:
+            float
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        Parameters:
+
+        Returns:
+            int
+        """
+        return self._states.count(EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table. All existing
+        key/value pairs remain in the new hash map, and all the hash
+        table links are rehashed. If new_capacity is less than 1 or
+        new_capacity is less than the table's size, the method
+        does nothing.
+
+        Parameters:
+            new_capacity: int
+
+        Returns:
+            None
+        """
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+
+        # Keep the load factor below 0.5 once every entry is rehashed.
+        while self._size >= new_capacity * 0.5:
+            new_capacity *= 2
+        new_capacity = _next_power_of_two(new_capacity)
+
+        old_states, old_hashes = self._states, self._hashes
+        old_keys, old_values = self._keys, self._values
+
+        self._hashes = hashes = array('q', bytes(8 * new_capacity))
+        self._keys = keys = [None] * new_capacity
+        self._values = values = [None] * new_capacity
+        self._states = states = bytearray(new_capacity)
+        self._capacity = new_capacity
+        self._mask = mask = new_capacity - 1
+
+        # Live slots are copied over using their stored hash; tombstones are dropped.
+        for i in range(len(old_states)):
+            if old_states[i] == LIVE:
+                hash = old_hashes[i]
+                index = hash & mask
+                j = 1
+                while states[index]:
+                    index = (index + j) & mask
+                    j += 1
+                states[index] = LIVE
+                hashes[index] = hash
+                keys[index] = old_keys[i]
+                values[index] = old_values[i]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns None.
+
+        Parameters:
+            key: str
+
+        Returns:
+            object
+        """
+        index = self._find(key, _to_int64(self._hash_function(key)))
+        return None if index == -1 else self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Parameters:
+            key: str
+
+        Returns:
+            True - if the given key is in the hash map.
+            Otherwise returns False.
+        """
+        if self._size == 0:
+            return False
+        return self._find(key, _to_int64(self._hash_function(key))) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+
+        Parameters:
+            key: str
+
+        Returns:
+            None
+        """
+        index = self._find(key, _to_int64(self._hash_function(key)))
+        if index != -1:
+            # Drop the references so removed keys and values can be freed.
+            self._states[index] = TOMBSTONE
+            self._keys[index] = None
+            self._values[index] = None
+            self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying
+        hash table capacity.
+
+        Parameters:
+
+        Returns:
+            None
+        """
+        capacity = self._capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+        self._size = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Parameters:
+
+        Returns:
+            DynamicArray - contains all the keys stored in the hash map.
+        """
+        array_of_keys = DynamicArray()
+        states, keys = self._states, self._keys
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                array_of_keys.append(keys[i])
+        return array_of_keys
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove")
+    print("------------------")
+    m = HashMap(50, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.contains_key('str42'), m.contains_key('str150'))
+    m.remove('str42')
+    print(m.get('str42'), m.contains_key('str42'), m.get_size())
+
+    print("\nresize / get_keys")
+    print("-----------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys())
+    m.resize_table(1)
+    print(m.get_keys(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
@@ -0,0 +1,189 @@
+# Description: Measures how well a hash function spreads a given set of keys.
+# For each function and capacity it reports the bucket distribution, a
+# chi-square test of uniformity, the expected and observed number of
+# collisions, and the get() probe lengths that result in the Separate Chaining
+# (SC) and Open Addressing (OA) HashMaps.
+# Run directly with `python hash_quality.py [corpus_file] [capacity ...]`;
+# the corpus file holds one key per line.
+# The following functions are included:
+#   bucket_counts()
+#   chi_square()
+#   expected_collisions()
+#   probe_lengths()
+#   analyze()
+#   report()
+
+import sys
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_many, hash_function_1, hash_function_2, hash_function_3
+
+
+def bucket_counts(function, keys: list, capacity: int) -> list:
+    """
+    Returns how many of the keys land in each bucket of a table with the
+    given capacity.
+
+    Parameters:
+        function: hash function
+        keys: list
+        capacity: int
+
+    Returns:
+        list - counts[i] is the number of keys in bucket i
+    """
+    counts = [0] * capacity
+    for hash in hash_many(function, keys):
+        counts[hash % capacity] += 1
+    return counts
+
+
+def chi_square(counts: list) -> float:
+    """
+    Returns the chi-square statistic of the bucket counts against a uniform
+    distribution. For a good hash function it is close to the number of
+    buckets minus one.
+
+    Parameters:
+        counts: list
+
+    Returns:
+        float
+    """
+    expected = sum(counts) / len(counts)
+    if expected == 0:
+        return 0.0
+    return sum((count - expected) ** 2 for count in counts) / expected
+
+
+def expected_collisions(size: int, capacity: int) -> float:
+    """
+    Returns the number of keys expected to land in an already occupied bucket
+    when size keys are hashed uniformly into capacity buckets.
+
+    Parameters:
+        size: int
+        capacity: int
+
+    Returns:
+        float
+    """
+    # size keys minus the expected number of occupied buckets.
+    return size - capacity * (1 - (1 - 1 / capacity) ** size)
+
+
+def probe_lengths(function, keys: list, capacity: int) -> dict:
+    """
+    Builds an instrumented SC and OA HashMap of the given capacity from the
+    keys, looks every key up once and returns the get() probe summary of each.
+    The SC map is kept at the given capacity, with plain chains; the OA map
+    grows as it must.
+
+    Parameters:
+        function: hash function
+        keys: list
+        capacity: int
+
+    Returns:
+        dict - {'sc': summary, 'oa': summary, 'oa_capacity': int}
+    """
+    # Chains are not treeified, so the SC summary is the hops walked.
+    sc = hash_map_sc.HashMap(capacity, function, max_load_factor=None, instrument=True,
+                             treeify_threshold=None)
+    oa = hash_map_oa.HashMap(capacity, function, instrument=True)
+    for key in keys:
+        sc.put(key, None)
+        oa.put(key, None)
+    for key in keys:
+        sc.get(key)
+        oa.get(key)
+    return {
+        'sc': sc.probe_report()['get'],
+        'oa': oa.probe_report()['get'],
+        'oa_capacity': oa.get_capacity(),
+    }
+
+
+def analyze(function, keys, capacity: int) -> dict:
+    """
+    Returns the quality figures of function over the distinct keys at the
+    given capacity: size, capacity, empty buckets, the largest bucket,
+    chi_square, chi_square_ratio (chi-square over its degrees of freedom,
+    about 1 for a uniform spread), expected and observed collisions, and the
+    SC and OA probe summaries from probe_lengths().
+
+    Parameters:
+        function: hash function
+        keys: iterable
+        capacity: int
+
+    Returns:
+        dict
+    """
+    keys = list(dict.fromkeys(keys))
+    counts = bucket_counts(function, keys, capacity)
+    chi = chi_square(counts)
+    occupied = capacity - counts.count(0)
+
+    result = {
+        'size': len(keys),
+        'capacity': capacity,
+        'empty_buckets': capacity - occupied,
+        'largest_bucket': max(counts),
+        'chi_square': chi,
+        'chi_square_ratio': chi / (capacity - 1) if capacity > 1 else 0.0,
+        'expected_collisions': expected_collisions(len(keys), capacity),
+        'observed_collisions': len(keys) - occupied,
+    }
+    result.update(probe_lengths(function, keys, capacity))
+    return result
+
+
+def report(keys, functions=(hash_function_1, hash_function_2, hash),
+           capacities=(257, 1021, 4093)) -> None:
+    """
+    Prints one row of analyze() figures per function and capacity.
+    Probe columns are p50/p99/max buckets or nodes read per get().
+
+    Parameters:
+        keys: iterable
+        functions: iterable of hash functions
+        capacities: iterable of int
+
+    Returns:
+        None
+    """
+    keys = list(dict.fromkeys(keys))
+    print(f"\n{len(keys)} distinct keys")
+    print(f"{'function':>16} {'capacity':>9} {'empty':>6} {'largest':>7} {'chi2/df':>8} "
+          f"{'exp coll':>9} {'obs coll':>9} {'SC probes':>11} {'OA probes':>11}")
+    for function in functions:
+        for capacity in capacities:
+            result = analyze(function, keys, capacity)
+            sc, oa = result['sc'], result['oa']
+            print(f"{function.__name__:>16} {capacity:>9} {result['empty_buckets']:>6} "
+                  f"{result['largest_bucket']:>7} {result['chi_square_ratio']:>8.2f} "
+                  f"{result['expected_collisions']:>9.0f} {result['observed_collisions']:>9} "
+                  f"{'/'.join(str(sc[p]) for p in ('p50', 'p99', 'max')):>11} "
+                  f"{'/'.join(str(oa[p]) for p in ('p50', 'p99', 'max')):>11}")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as corpus:
+            keys = [line.rstrip('\n') for line in corpus if line.strip()]
+        capacities = [int(arg) for arg in sys.argv[2:]] or (257, 1021, 4093)
+        report(keys, capacities=capacities)
+    else:
+        # Short keys, and the rotations of a few words and of their reversals:
+        # hash_function_1 sends all anagrams to the same bucket.
+        words = ['key' + str(i) for i in range(1000)]
+        for word in ('stop', 'least', 'parse', 'angle'):
+            words += [word[i:] + word[:i] for i in range(len(word))]
+            words += [word[::-1][i:] + word[::-1][:i] for i in range(len(word))]
+        report(words)
+
+        # hash_function_3 only takes integer keys.
+        report(range(0, 5000, 5), functions=(hash_function_3, hash))